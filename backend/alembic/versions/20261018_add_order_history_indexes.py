@@ -0,0 +1,28 @@
+"""add order history indexes
+
+Revision ID: 20261018_091500
+Revises: 20251012_135753
+Create Date: 2026-10-18 09:15:00.000000
+
+Composite indexes for the keyset-paginated order history: a user's orders
+by creation time, optionally narrowed to one status.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_091500'
+down_revision = '20251012_135753'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_user_id_status_created_at', 'orders', ['user_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_user_id_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
@@ -0,0 +1,43 @@
+"""add user access path indexes
+
+Revision ID: 20261018_101500
+Revises: 20261018_091500
+Create Date: 2026-10-18 10:15:00.000000
+
+Every position and watchlist query filters by user_id first. Adds a unique
+(user_id, symbol) key on positions, a partial index on active positions
+(quantity > 0) and an index on watchlists.user_id. Orders are covered by
+the order history indexes of the previous revision.
+
+The unique index fails if a user already holds two rows for one symbol;
+merge those before upgrading.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261018_101500'
+down_revision = '20261018_091500'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('uq_positions_user_id_symbol', 'positions', ['user_id', 'symbol'], unique=True)
+    op.create_index(
+        'ix_positions_user_id_active',
+        'positions',
+        ['user_id', 'symbol'],
+        unique=False,
+        postgresql_where=sa.text('quantity > 0'),
+        sqlite_where=sa.text('quantity > 0')
+    )
+    op.create_index(op.f('ix_watchlists_user_id'), 'watchlists', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_watchlists_user_id'), table_name='watchlists')
+    op.drop_index('ix_positions_user_id_active', table_name='positions')
+    op.drop_index('uq_positions_user_id_symbol', table_name='positions')
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from datetime import datetime, timezone
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from app.database import get_db
@@ -10,6 +13,19 @@ from app.api.v1.endpoints.auth import get_current_user
 
 router = APIRouter()
 
+ORDER_PAGE_DEFAULT = 100
+ORDER_PAGE_MAX = 500
+
+# Columns of OrderResponse, selected directly for the order history
+ORDER_COLUMNS = [getattr(Order, name) for name in OrderResponse.model_fields]
+
+
+def as_utc(value: datetime) -> datetime:
+    """Aware UTC datetime; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
 
 class BuyOrderRequest(BaseModel):
     """Simplified schema for buying stocks"""
@@ -21,7 +37,7 @@ class BuyOrderRequest(BaseModel):
 @router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_order(
     order_data: OrderCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new order"""
@@ -52,8 +68,8 @@ async def create_order(
     )
     
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    await db.commit()
+    await db.refresh(new_order)
     
     # TODO: Submit order to Alpaca/CCXT
     # For now, we just create it in our database
@@ -63,44 +79,74 @@ async def create_order(
 
 @router.get("/", response_model=List[OrderResponse])
 async def list_orders(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    status: str = None,
-    symbol: str = None
+    status_filter: Optional[str] = Query(None, alias="status"),
+    symbol: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(ORDER_PAGE_DEFAULT, ge=1, le=ORDER_PAGE_MAX)
 ):
-    """List user's orders with optional filters"""
+    """List user's orders, newest first, one page at a time.
+
+    When more orders match, the ``X-Next-Cursor`` header holds the cursor
+    for the next page; pass it back as ``?cursor=``.
+    """
     
-    query = db.query(Order).filter(Order.user_id == current_user.id)
+    query = select(*ORDER_COLUMNS).where(Order.user_id == current_user.id)
     
-    if status:
+    if status_filter:
         try:
-            order_status = OrderStatus[status.upper()]
-            query = query.filter(Order.status == order_status)
+            query = query.where(Order.status == OrderStatus[status_filter.upper()])
         except KeyError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status: {status}"
+                detail=f"Invalid status: {status_filter}"
             )
     
     if symbol:
-        query = query.filter(Order.symbol == symbol.upper())
+        query = query.where(Order.symbol == symbol.upper())
+    if since:
+        query = query.where(Order.created_at >= as_utc(since))
+    if until:
+        query = query.where(Order.created_at < as_utc(until))
+    
+    # Keyset: continue strictly after the (created_at, id) of the cursor's order
+    if cursor:
+        if not cursor.isdigit():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        last = aliased(Order)
+        query = query.where(tuple_(Order.created_at, Order.id) < select(last.created_at, last.id).where(
+            last.id == int(cursor),
+            last.user_id == current_user.id
+        ).scalar_subquery())
     
-    orders = query.order_by(Order.created_at.desc()).all()
-    return orders
+    # Plain rows rather than ORM objects: nothing to track in the session
+    result = await db.execute(query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1))
+    rows = result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+    return rows
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get order details by ID"""
     
-    order = db.query(Order).filter(
+    order = await db.scalar(select(Order).where(
         Order.id == order_id,
         Order.user_id == current_user.id
-    ).first()
+    ))
     
     if not order:
         raise HTTPException(
@@ -114,15 +160,15 @@ async def get_order(
 @router.delete("/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_order(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel an order"""
     
-    order = db.query(Order).filter(
+    order = await db.scalar(select(Order).where(
         Order.id == order_id,
         Order.user_id == current_user.id
-    ).first()
+    ))
     
     if not order:
         raise HTTPException(
@@ -139,7 +185,7 @@ async def cancel_order(
     
     # Update order status
     order.status = OrderStatus.CANCELLED
-    db.commit()
+    await db.commit()
     
     # TODO: Cancel order in Alpaca/CCXT
     
@@ -149,7 +195,7 @@ async def cancel_order(
 @router.post("/buy", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def buy_stock(
     buy_data: BuyOrderRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Convenience endpoint to buy stocks immediately at market or limit price"""
@@ -169,8 +215,8 @@ async def buy_stock(
     )
     
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    await db.commit()
+    await db.refresh(new_order)
     
     # TODO: Submit order to Alpaca/CCXT
     # For now, we just create it in our database
@@ -181,7 +227,7 @@ async def buy_stock(
 @router.post("/queue-buy", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def queue_buy_stock(
     buy_data: BuyOrderRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Queue a buy order to be executed later (always as limit order with PENDING status)"""
@@ -204,8 +250,8 @@ async def queue_buy_stock(
     )
     
     db.add(queued_order)
-    db.commit()
-    db.refresh(queued_order)
+    await db.commit()
+    await db.refresh(queued_order)
     
     # This order stays in PENDING status until manually executed or market conditions are met
     
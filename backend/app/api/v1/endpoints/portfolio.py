@@ -1,24 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.models.portfolio import Portfolio
 from app.schemas.portfolio import PortfolioResponse
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.valuation import PositionBook, book_query, portfolio_values, value_book
 
 router = APIRouter()
 
 
 @router.get("/", response_model=PortfolioResponse)
 async def get_portfolio(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's portfolio summary"""
     
-    portfolio = db.query(Portfolio).filter(
+    portfolio = await db.scalar(select(Portfolio).where(
         Portfolio.user_id == current_user.id
-    ).first()
+    ))
     
     if not portfolio:
         raise HTTPException(
@@ -26,6 +28,9 @@ async def get_portfolio(
             detail="Portfolio not found"
         )
     
-    # TODO: Update portfolio values from Alpaca/CCXT
+    # Value open positions at the latest cached quotes; nothing is written back
+    rows = await db.execute(book_query(current_user.id))
+    totals = value_book(PositionBook.from_rows(rows.all())).for_user(current_user.id)
     
-    return portfolio
+    response = PortfolioResponse.model_validate(portfolio)
+    return response.model_copy(update=portfolio_values(portfolio.cash_balance or 0.0, totals))
@@ -1,44 +1,64 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.database import get_db
 from app.models.user import User
 from app.models.position import Position
 from app.schemas.position import PositionResponse
 from app.api.v1.endpoints.auth import get_current_user
+from app.market_data.quotes import quote_cache
 
 router = APIRouter()
 
 
+def value_position(position: Position) -> PositionResponse:
+    """Position valued at the latest cached quote, without writing to the DB.
+
+    Falls back to the stored valuation when no fresh quote is cached.
+    """
+    response = PositionResponse.model_validate(position)
+    quote = quote_cache.get(position.symbol)
+    if quote is None:
+        return response
+    market_value = position.quantity * quote.price
+    unrealized_pl = market_value - position.cost_basis
+    return response.model_copy(update={
+        'current_price': quote.price,
+        'market_value': market_value,
+        'unrealized_pl': unrealized_pl,
+        'unrealized_pl_percent': unrealized_pl / position.cost_basis * 100 if position.cost_basis else 0.0,
+        'price_updated_at': quote.updated_at
+    })
+
+
 @router.get("/", response_model=List[PositionResponse])
 async def list_positions(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List user's current positions"""
     
-    positions = db.query(Position).filter(
+    positions = await db.scalars(select(Position).where(
         Position.user_id == current_user.id,
         Position.quantity > 0  # Only active positions
-    ).all()
+    ))
     
-    # TODO: Update current prices from Alpaca/CCXT
-    
-    return positions
+    return [value_position(position) for position in positions]
 
 
 @router.get("/{symbol}", response_model=PositionResponse)
 async def get_position(
     symbol: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get position details for a specific symbol"""
     
-    position = db.query(Position).filter(
+    position = await db.scalar(select(Position).where(
         Position.user_id == current_user.id,
         Position.symbol == symbol.upper()
-    ).first()
+    ))
     
     if not position:
         raise HTTPException(
@@ -46,6 +66,4 @@ async def get_position(
             detail=f"No position found for symbol: {symbol}"
         )
     
-    # TODO: Update current price from Alpaca/CCXT
-    
-    return position
+    return value_position(position)
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 from app.database import get_db
 from app.models.user import User
@@ -11,56 +13,72 @@ from app.schemas.watchlist import (
     WatchlistItemResponse
 )
 from app.api.v1.endpoints.auth import get_current_user
+from app.market_data.quotes import quote_cache
 
 router = APIRouter()
 
 
+def with_quotes(watchlist: Watchlist) -> WatchlistResponse:
+    """Watchlist response with the latest cached price of each item"""
+    response = WatchlistResponse.model_validate(watchlist)
+    for item in response.items or []:
+        quote = quote_cache.get(item.symbol)
+        if quote:
+            item.last_price = quote.price
+            item.price_updated_at = quote.updated_at
+    return response
+
+
 @router.post("/", response_model=WatchlistResponse, status_code=status.HTTP_201_CREATED)
 async def create_watchlist(
     watchlist_data: WatchlistCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new watchlist"""
     
     new_watchlist = Watchlist(
         user_id=current_user.id,
-        name=watchlist_data.name
+        name=watchlist_data.name,
+        items=[]
     )
     
     db.add(new_watchlist)
-    db.commit()
-    db.refresh(new_watchlist)
+    await db.commit()
+    await db.refresh(new_watchlist, ["created_at"])
     
     return new_watchlist
 
 
 @router.get("/", response_model=List[WatchlistResponse])
 async def list_watchlists(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """List user's watchlists"""
     
-    watchlists = db.query(Watchlist).filter(
-        Watchlist.user_id == current_user.id
-    ).all()
+    watchlists = await db.scalars(
+        select(Watchlist)
+        .where(Watchlist.user_id == current_user.id)
+        .options(selectinload(Watchlist.items))
+    )
     
-    return watchlists
+    return [with_quotes(watchlist) for watchlist in watchlists]
 
 
 @router.get("/{watchlist_id}", response_model=WatchlistResponse)
 async def get_watchlist(
     watchlist_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get watchlist details by ID"""
     
-    watchlist = db.query(Watchlist).filter(
-        Watchlist.id == watchlist_id,
-        Watchlist.user_id == current_user.id
-    ).first()
+    watchlist = await db.scalar(
+        select(Watchlist)
+        .where(Watchlist.id == watchlist_id, Watchlist.user_id == current_user.id)
+        .options(selectinload(Watchlist.items))
+    )
     
     if not watchlist:
         raise HTTPException(
@@ -68,21 +86,23 @@ async def get_watchlist(
             detail="Watchlist not found"
         )
     
-    return watchlist
+    return with_quotes(watchlist)
 
 
 @router.delete("/{watchlist_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_watchlist(
     watchlist_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete a watchlist"""
     
-    watchlist = db.query(Watchlist).filter(
-        Watchlist.id == watchlist_id,
-        Watchlist.user_id == current_user.id
-    ).first()
+    # Items are loaded up front for the delete-orphan cascade
+    watchlist = await db.scalar(
+        select(Watchlist)
+        .where(Watchlist.id == watchlist_id, Watchlist.user_id == current_user.id)
+        .options(selectinload(Watchlist.items))
+    )
     
     if not watchlist:
         raise HTTPException(
@@ -90,8 +110,8 @@ async def delete_watchlist(
             detail="Watchlist not found"
         )
     
-    db.delete(watchlist)
-    db.commit()
+    await db.delete(watchlist)
+    await db.commit()
     
     return None
 
@@ -100,16 +120,16 @@ async def delete_watchlist(
 async def add_item_to_watchlist(
     watchlist_id: int,
     item_data: WatchlistItemCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a stock/crypto to watchlist"""
     
     # Verify watchlist exists and belongs to user
-    watchlist = db.query(Watchlist).filter(
+    watchlist = await db.scalar(select(Watchlist.id).where(
         Watchlist.id == watchlist_id,
         Watchlist.user_id == current_user.id
-    ).first()
+    ))
     
     if not watchlist:
         raise HTTPException(
@@ -118,10 +138,10 @@ async def add_item_to_watchlist(
         )
     
     # Check if item already exists
-    existing_item = db.query(WatchlistItem).filter(
+    existing_item = await db.scalar(select(WatchlistItem.id).where(
         WatchlistItem.watchlist_id == watchlist_id,
         WatchlistItem.symbol == item_data.symbol.upper()
-    ).first()
+    ))
     
     if existing_item:
         raise HTTPException(
@@ -137,8 +157,8 @@ async def add_item_to_watchlist(
     )
     
     db.add(new_item)
-    db.commit()
-    db.refresh(new_item)
+    await db.commit()
+    await db.refresh(new_item)
     
     return new_item
 
@@ -147,16 +167,16 @@ async def add_item_to_watchlist(
 async def remove_item_from_watchlist(
     watchlist_id: int,
     symbol: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Remove a stock/crypto from watchlist"""
     
     # Verify watchlist exists and belongs to user
-    watchlist = db.query(Watchlist).filter(
+    watchlist = await db.scalar(select(Watchlist.id).where(
         Watchlist.id == watchlist_id,
         Watchlist.user_id == current_user.id
-    ).first()
+    ))
     
     if not watchlist:
         raise HTTPException(
@@ -165,10 +185,10 @@ async def remove_item_from_watchlist(
         )
     
     # Find and delete item
-    item = db.query(WatchlistItem).filter(
+    item = await db.scalar(select(WatchlistItem).where(
         WatchlistItem.watchlist_id == watchlist_id,
         WatchlistItem.symbol == symbol.upper()
-    ).first()
+    ))
     
     if not item:
         raise HTTPException(
@@ -176,7 +196,7 @@ async def remove_item_from_watchlist(
             detail="Item not found in watchlist"
         )
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     
     return None
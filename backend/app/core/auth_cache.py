@@ -0,0 +1,145 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+from jose import JWTError, jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app.core.config import settings
+from app.models.user import User
+import time
+
+
+class AuthCache:
+    """Verified bearer tokens and recently authenticated users, per worker.
+
+    ``tokens`` is an LRU of token -> (user id, expiry), so a repeated token
+    skips signature verification; its expiry is still checked on each hit.
+    ``users`` keeps a detached copy of each active user for ``ttl`` seconds,
+    so most requests skip the users query. A flush that updates or deletes
+    a user drops its entry, and so does the commit (a request may cache the
+    still-committed row in between); other workers see it within ``ttl``.
+    ORM bulk ``update(User)``/``delete(User)`` through a session clear the
+    whole cache on commit. Core statements run on a bare connection bypass
+    the session events: call ``invalidate``/``clear`` after them.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 10000, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.tokens: "OrderedDict[str, Tuple[int, Optional[float]]]" = OrderedDict()
+        self.users: "OrderedDict[int, Tuple[float, User]]" = OrderedDict()
+        self.generation = 0  # bumped by every invalidation
+        self.token_hits = 0
+        self.token_misses = 0
+        self.user_hits = 0
+        self.user_misses = 0
+
+    def user_id(self, token: str) -> int:
+        """User id of a valid token; raises JWTError or ValueError otherwise"""
+        entry = self.tokens.get(token)
+        if entry is None:
+            self.token_misses += 1
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if payload.get("sub") is None:
+                raise JWTError("Token has no subject")
+            entry = (int(payload["sub"]), payload.get("exp"))
+            self.tokens[token] = entry
+            if len(self.tokens) > self.max_entries:
+                self.tokens.popitem(last=False)
+            return entry[0]
+
+        self.token_hits += 1
+        if entry[1] is not None and entry[1] < self.clock():
+            del self.tokens[token]
+            raise JWTError("Signature has expired.")
+        self.tokens.move_to_end(token)
+        return entry[0]
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Detached copy of the user, or None when missing or expired"""
+        entry = self.users.get(user_id)
+        if entry is None or entry[0] < self.clock():
+            self.user_misses += 1
+            return None
+        self.user_hits += 1
+        return entry[1]
+
+    def put(self, user: User, generation: int):
+        """Cache ``user`` unless something was invalidated since ``generation`` was read.
+
+        That guards against storing a row read just before a concurrent
+        deactivation committed.
+        """
+        if self.ttl <= 0 or generation != self.generation:
+            return
+        copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+        make_transient_to_detached(copy)
+        self.users.pop(user.id, None)
+        self.users[user.id] = (self.clock() + self.ttl, copy)
+        if len(self.users) > self.max_entries:
+            self.users.popitem(last=False)  # fixed TTL, so the oldest entry expires first
+
+    def invalidate(self, user_id: int):
+        """Forget a user, e.g. after deactivation or a password change"""
+        self.generation += 1
+        self.users.pop(user_id, None)
+
+    def clear(self):
+        """Forget every cached user"""
+        self.generation += 1
+        self.users.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "tokens": len(self.tokens),
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "users": len(self.users),
+            "user_hits": self.user_hits,
+            "user_misses": self.user_misses,
+        }
+
+
+auth_cache = AuthCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_SIZE)
+
+
+# session.info key: ids of users changed in the current transaction (None = all)
+PENDING = "auth_cache_pending"
+
+
+def _pending(session) -> set:
+    return session.info.setdefault(PENDING, set())
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    auth_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        _pending(session).add(target.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_user_change(state):
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is User:
+        auth_cache.clear()
+        _pending(state.session).add(None)
+
+
+@event.listens_for(Session, "after_commit")
+def _user_changes_committed(session):
+    changed = session.info.pop(PENDING, None)
+    if not changed:
+        return
+    if None in changed:
+        auth_cache.clear()
+    else:
+        for user_id in changed:
+            auth_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _user_changes_rolled_back(session):
+    session.info.pop(PENDING, None)
@@ -15,6 +15,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = 12  # cost factor for new hashes; existing hashes keep theirs
+    BCRYPT_WORKERS: int = 0  # hashing threads, 0 = one per CPU core
+    BCRYPT_MAX_PENDING: int = 256  # jobs handed to the pool at once; the rest wait
+    AUTH_CACHE_TTL_SECONDS: float = 30.0  # how long a worker trusts a loaded user, 0 disables
+    AUTH_CACHE_SIZE: int = 10000  # verified tokens and users kept per worker
     
     # Alpaca
     ALPACA_API_KEY: Optional[str] = None
@@ -28,6 +33,16 @@ class Settings(BaseSettings):
     # Polygon
     POLYGON_API_KEY: Optional[str] = None
     
+    # Market data ingestion
+    MARKET_DATA_SOURCE: str = "none"  # synthetic, replay, alpaca or ccxt
+    MARKET_DATA_SYNTHETIC_RATE: float = 1.0  # ticks per second per symbol
+    MARKET_DATA_REPLAY_FILE: Optional[str] = None
+    MARKET_DATA_REPLAY_SPEED: float = 1.0  # 0 replays as fast as possible
+    CCXT_EXCHANGE: str = "binance"
+    QUOTE_CACHE_TTL_SECONDS: float = 60.0  # older quotes read as missing
+    EOD_SNAPSHOT_TIME_UTC: str = "21:00"  # daily portfolio snapshot, then the previous close rolls
+    MARKET_DATA_LEASE_SECONDS: float = 10.0  # with a backplane, one worker ingests; others take over after this
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
@@ -36,6 +51,13 @@ class Settings(BaseSettings):
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "SpeedTrade"
     
+    # WebSocket
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_MAX_DROPPED_MESSAGES: int = 10000
+    WS_PRICE_CONFLATION_MS: int = 0  # 0 sends every tick
+    WS_BACKPLANE: str = "none"  # "redis" to fan out across uvicorn workers via REDIS_URL
+    WS_BACKPLANE_ANNOUNCE_SECONDS: float = 5.0  # heartbeat of each worker's subscribed symbols
+    
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
     
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from app.core.config import settings
+import asyncio
+import os
+import time
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification off the event loop.
+
+    Work runs on a dedicated thread pool (bcrypt releases the GIL, so
+    throughput scales with cores). At most ``max_pending`` jobs are handed
+    to the pool; further callers wait on the event loop without holding a
+    thread. ``pending`` is the current queue depth (waiting + running).
+    """
+
+    def __init__(self, rounds: int = 12, workers: int = 0, max_pending: int = 256):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+        self._slots = None
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+
+    async def _run(self, fn, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, self._timed, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(self.context.verify, password, hashed)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "mean_ms": round(self.busy_seconds / self.completed * 1000, 1) if self.completed else 0.0,
+        }
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.BCRYPT_WORKERS,
+    max_pending=settings.BCRYPT_MAX_PENDING
+)
@@ -1,20 +1,60 @@
+from contextlib import asynccontextmanager
+from datetime import time
 from fastapi import FastAPI, WebSocket, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.auth_cache import auth_cache
 from app.api.v1.router import api_router
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal
 from app.websocket.handlers import handle_websocket
+from app.websocket.manager import manager
+from app.websocket.backplane import RedisBackplane
+from app.market_data import MarketDataLeader, MarketDataService, create_source
+from app.services.valuation import EndOfDay
 from app.api.v1.endpoints.auth import get_current_user
 from app.models.user import User
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background services"""
+    backplane = None
+    if settings.WS_BACKPLANE == "redis":
+        backplane = RedisBackplane(settings.REDIS_URL)
+        await manager.start(backplane)
+    source = create_source(settings.MARKET_DATA_SOURCE)
+    if source:
+        service = MarketDataService(source, manager)
+        if backplane:
+            # one worker ingests and publishes; the others consume from the backplane
+            service = MarketDataLeader(service, backplane, ttl=settings.MARKET_DATA_LEASE_SECONDS)
+        app.state.market_data = service
+        await app.state.market_data.start()
+    app.state.end_of_day = EndOfDay(
+        time.fromisoformat(settings.EOD_SNAPSHOT_TIME_UTC),
+        SessionLocal,
+        backplane=backplane,
+        lease_ttl=settings.MARKET_DATA_LEASE_SECONDS
+    )
+    await app.state.end_of_day.start()
+    yield
+    await app.state.end_of_day.stop()
+    if source:
+        await app.state.market_data.stop()
+        app.state.market_data = None
+    await manager.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     debug=settings.DEBUG,
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,6 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -46,6 +87,20 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """WebSocket, market data, end of day, password hashing and auth cache counters"""
+    market_data = getattr(app.state, "market_data", None)
+    end_of_day = getattr(app.state, "end_of_day", None)
+    return {
+        "websocket": manager.metrics(),
+        "password_hashing": password_hasher.metrics(),
+        "auth_cache": auth_cache.metrics(),
+        "market_data": market_data.metrics() if market_data else None,
+        "end_of_day": end_of_day.metrics() if end_of_day else None
+    }
+
+
 @app.websocket("/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: int):
     """WebSocket endpoint for real-time updates"""
@@ -0,0 +1,22 @@
+from app.market_data.ticks import Tick
+from app.market_data.sources import (
+    MarketDataSource,
+    SyntheticSource,
+    ReplaySource,
+    AlpacaSource,
+    CCXTSource,
+    create_source,
+)
+from app.market_data.service import MarketDataLeader, MarketDataService
+
+__all__ = [
+    "Tick",
+    "MarketDataSource",
+    "SyntheticSource",
+    "ReplaySource",
+    "AlpacaSource",
+    "CCXTSource",
+    "create_source",
+    "MarketDataService",
+    "MarketDataLeader",
+]
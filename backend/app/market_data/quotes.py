@@ -0,0 +1,128 @@
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from app.core.config import settings
+import math
+import time
+
+NAN = float("nan")
+
+
+class Quote(NamedTuple):
+    """Latest cached quote for a symbol"""
+
+    symbol: str
+    price: float
+    bid: Optional[float]
+    ask: Optional[float]
+    updated_at: datetime
+
+    def as_dict(self) -> dict:
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "bid": self.bid,
+            "ask": self.ask,
+            "timestamp": int(self.updated_at.timestamp() * 1000),
+        }
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class QuoteCache:
+    """Latest quote per symbol in parallel float arrays.
+
+    Each symbol gets a fixed slot on its first update, so reads and writes
+    are a dict lookup plus array indexing, with no per-quote objects kept
+    alive. Quotes older than ``ttl`` seconds read as missing. ``prev_close``
+    holds the reference price for day P&L, set by ``roll_day``.
+    """
+
+    def __init__(self, ttl: float = 60.0, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self.slots: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.price = array("d")
+        self.bid = array("d")
+        self.ask = array("d")
+        self.updated = array("d")
+        self.prev_close = array("d")
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def _columns(self):
+        return (self.price, self.bid, self.ask, self.updated, self.prev_close)
+
+    def update(self, symbol: str, price: float, bid: Optional[float] = None, ask: Optional[float] = None):
+        """Store the latest quote for ``symbol``"""
+        slot = self.slots.get(symbol)
+        if slot is None:
+            # grow every column before publishing the slot; an append fails
+            # while a column's buffer is exported, so undo a partial one
+            grown = []
+            try:
+                for column in self._columns():
+                    column.append(NAN)
+                    grown.append(column)
+            except BufferError:
+                for column in grown:
+                    column.pop()
+                raise
+            slot = len(self.symbols)
+            self.symbols.append(symbol)
+            self.slots[symbol] = slot
+        self.price[slot] = price
+        self.bid[slot] = NAN if bid is None else bid
+        self.ask[slot] = NAN if ask is None else ask
+        self.updated[slot] = self.clock()
+
+    def copy(self) -> "QuoteCache":
+        """Independent copy, e.g. for reading in another thread while this one keeps updating"""
+        copy = QuoteCache(self.ttl, self.clock)
+        copy.slots = dict(self.slots)
+        copy.symbols = list(self.symbols)
+        copy.price, copy.bid, copy.ask, copy.updated, copy.prev_close = (
+            column[:] for column in self._columns()
+        )
+        return copy
+
+    def roll_day(self):
+        """Make the current prices the previous close, e.g. after the EOD snapshot"""
+        self.prev_close[:] = self.price
+
+    def _fresh_slot(self, symbol: str) -> Optional[int]:
+        slot = self.slots.get(symbol)
+        if slot is None or self.clock() - self.updated[slot] > self.ttl:
+            return None
+        return slot
+
+    def get(self, symbol: str) -> Optional[Quote]:
+        """Quote for ``symbol``, or None when unknown or older than the TTL"""
+        slot = self._fresh_slot(symbol)
+        if slot is None:
+            return None
+        return Quote(
+            symbol,
+            self.price[slot],
+            _optional(self.bid[slot]),
+            _optional(self.ask[slot]),
+            datetime.fromtimestamp(self.updated[slot], timezone.utc)
+        )
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """Fresh price for ``symbol`` or None"""
+        slot = self._fresh_slot(symbol)
+        return None if slot is None else self.price[slot]
+
+    def snapshot(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """Fresh quotes for the symbols that have one"""
+        quotes = (self.get(symbol) for symbol in symbols)
+        return {q.symbol: q.as_dict() for q in quotes if q}
+
+
+# Shared by the market data path (writer) and the REST endpoints (readers)
+quote_cache = QuoteCache(settings.QUOTE_CACHE_TTL_SECONDS)
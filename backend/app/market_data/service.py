@@ -0,0 +1,184 @@
+from typing import Dict, Optional
+from app.market_data.sources import MarketDataSource
+from app.market_data.ticks import Tick
+import asyncio
+import time
+
+
+class Throughput:
+    """Event counter with a per-second rate over the last full window"""
+
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.total = 0
+        self.rate = 0.0
+        self._count = 0
+        self._start = time.monotonic()
+
+    def add(self, n: int = 1):
+        self.total += n
+        self._count += n
+        now = time.monotonic()
+        if now - self._start >= self.window:
+            self.rate = self._count / (now - self._start)
+            self._count = 0
+            self._start = now
+
+    def per_second(self) -> float:
+        # an idle meter decays to 0 instead of reporting its last busy window
+        if time.monotonic() - self._start >= 2 * self.window:
+            return 0.0
+        return self.rate
+
+
+class MarketDataService:
+    """Feeds ticks from a source into ``manager.broadcast_price_update``.
+
+    The source only streams symbols that have at least one WebSocket
+    subscriber (on any worker, with a backplane): the service follows the
+    manager's symbol activity and applies upstream subscribe/unsubscribe
+    changes in order. Ticks pass
+    through a bounded queue; when broadcasting falls behind, new ticks are
+    dropped and counted rather than buffered without limit.
+    """
+
+    def __init__(self, source: MarketDataSource, manager, queue_size: int = 10000):
+        self.source = source
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.ticks_in = Throughput()
+        self.ticks_out = Throughput()
+        self.dropped = 0
+        self.lag_ms = 0.0
+        self._changes: Dict[str, bool] = {}
+        self._changed = asyncio.Event()
+        self._tasks = []
+
+    async def start(self):
+        await self.source.start(self._emit)
+        self.manager.symbol_listeners.append(self._symbol_changed)
+        self._changes = {}
+        for symbol in self.manager.wanted_symbols():
+            self._symbol_changed(symbol, True)
+        self._tasks = [
+            asyncio.create_task(self._pump()),
+            asyncio.create_task(self._sync_subscriptions()),
+        ]
+
+    async def stop(self):
+        if self._symbol_changed in self.manager.symbol_listeners:
+            self.manager.symbol_listeners.remove(self._symbol_changed)
+        for task in self._tasks:
+            task.cancel()
+        await self.source.stop()
+
+    def _symbol_changed(self, symbol: str, active: bool):
+        self._changes[symbol] = active
+        self._changed.set()
+
+    async def _sync_subscriptions(self):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            changes, self._changes = self._changes, {}
+            added = [s for s, active in changes.items() if active]
+            removed = [s for s, active in changes.items() if not active]
+            try:
+                if removed:
+                    await self.source.unsubscribe(removed)
+                if added:
+                    await self.source.subscribe(added)
+            except Exception as e:
+                print(f"Market data subscription error: {e}")
+
+    def _emit(self, tick: Tick):
+        try:
+            self.queue.put_nowait(tick)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return
+        self.ticks_in.add()
+
+    async def _pump(self):
+        while True:
+            tick = await self.queue.get()
+            try:
+                await self.manager.broadcast_price_update(tick.symbol, tick.as_dict())
+            except Exception as e:
+                print(f"Error broadcasting {tick.symbol}: {e}")
+                continue
+            self.ticks_out.add()
+            # exponential moving average of time spent between ingestion and fan-out
+            lag = (time.monotonic() - tick.received) * 1000
+            self.lag_ms += 0.05 * (lag - self.lag_ms)
+
+    def metrics(self) -> dict:
+        return {
+            "source": self.source.name,
+            "symbols": len(self.source.symbols),
+            "ticks_in": self.ticks_in.total,
+            "ticks_out": self.ticks_out.total,
+            "ticks_in_per_sec": round(self.ticks_in.per_second(), 1),
+            "ticks_out_per_sec": round(self.ticks_out.per_second(), 1),
+            "dropped": self.dropped,
+            "queued": self.queue.qsize(),
+            "lag_ms": round(self.lag_ms, 3),
+        }
+
+
+# held by the worker that ingests market data and writes the end-of-day snapshot
+LEADER_LEASE = "market-data"
+
+
+class MarketDataLeader:
+    """Runs ``service`` on the one worker holding the backplane lease ``name``.
+
+    Otherwise every worker would ingest the feed and publish each tick, so
+    clients got one copy per worker (and some feeds, such as Alpaca, allow
+    a single stream per key). The holder renews the lease every third of
+    ``ttl``; the other workers only consume prices from the backplane and
+    one of them takes over within ``ttl`` of the holder going away.
+    """
+
+    def __init__(self, service: MarketDataService, backplane, name: str = LEADER_LEASE, ttl: float = 10.0):
+        self.service = service
+        self.backplane = backplane
+        self.name = name
+        self.ttl = ttl
+        self.leading = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        if self.leading:
+            self.leading = False
+            await self.service.stop()
+            try:
+                await self.backplane.release_lease(self.name)
+            except Exception as e:
+                print(f"Error releasing {self.name} lease: {e}")
+
+    async def elect(self):
+        """Take or renew the lease, then start or stop the service to match"""
+        try:
+            leading = await self.backplane.acquire_lease(self.name, self.ttl)
+        except Exception as e:
+            print(f"Error renewing {self.name} lease: {e}")
+            leading = False
+        if leading and not self.leading:
+            await self.service.start()
+        elif self.leading and not leading:
+            await self.service.stop()
+        self.leading = leading
+
+    async def _run(self):
+        while True:
+            await self.elect()
+            await asyncio.sleep(self.ttl / 3)
+
+    def metrics(self) -> dict:
+        return {"leader": self.leading, **self.service.metrics()}
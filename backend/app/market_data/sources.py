@@ -0,0 +1,274 @@
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Set
+from app.core.config import settings
+from app.market_data.ticks import Tick
+import asyncio
+import csv
+import random
+import threading
+
+Emit = Callable[[Tick], None]
+
+
+class MarketDataSource:
+    """Pushes ticks for the subscribed symbols to the ``emit`` callback.
+
+    ``emit`` is called on the event loop and must not block. Subscriptions
+    are driven by the ingestion service, which only asks for symbols that
+    have at least one WebSocket subscriber.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.symbols: Set[str] = set()
+        self._emit: Optional[Emit] = None
+
+    async def start(self, emit: Emit):
+        self._emit = emit
+
+    async def stop(self):
+        self._emit = None
+        self.symbols.clear()
+
+    async def subscribe(self, symbols: Iterable[str]):
+        self.symbols.update(symbols)
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        self.symbols.difference_update(symbols)
+
+
+class SyntheticSource(MarketDataSource):
+    """Random-walk quotes at ``rate`` ticks per second per subscribed symbol"""
+
+    name = "synthetic"
+
+    def __init__(self, rate: float = 1.0, seed: Optional[int] = None):
+        super().__init__()
+        self.rate = rate
+        self.prices: Dict[str, float] = {}
+        self._random = random.Random(seed)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, emit: Emit):
+        await super().start(emit)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        await super().stop()
+
+    def next_tick(self, symbol: str) -> Tick:
+        price = self.prices.get(symbol) or self._random.uniform(10, 500)
+        price = round(max(0.01, price * (1 + self._random.gauss(0, 0.0005))), 2)
+        self.prices[symbol] = price
+        return Tick.now(symbol, price, bid=round(price - 0.01, 2), ask=round(price + 0.01, 2),
+                        volume=self._random.randint(1, 500))
+
+    async def _run(self):
+        interval = 1 / self.rate
+        while True:
+            for symbol in list(self.symbols):
+                self._emit(self.next_tick(symbol))
+            await asyncio.sleep(interval)
+
+
+class ReplaySource(MarketDataSource):
+    """Replay quotes from a CSV file (symbol,price,bid,ask,volume,timestamp).
+
+    Gaps between timestamps (epoch seconds or ISO 8601) are replayed
+    divided by ``speed``; ``speed=0`` replays as fast as possible. Ticks
+    are stamped with the current time, like a live feed. The file is only
+    read while some symbol is subscribed; when looping, a pass without
+    timestamp gaps counts as one second of data.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._task: Optional[asyncio.Task] = None
+        self._wanted = asyncio.Event()
+
+    async def start(self, emit: Emit):
+        await super().start(emit)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        self._wanted.clear()
+        await super().stop()
+
+    async def subscribe(self, symbols: Iterable[str]):
+        await super().subscribe(symbols)
+        if self.symbols:
+            self._wanted.set()
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        await super().unsubscribe(symbols)
+        if not self.symbols:
+            self._wanted.clear()
+
+    @staticmethod
+    def _time(value: str) -> float:
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+    @staticmethod
+    def _float(value: Optional[str]) -> Optional[float]:
+        return float(value) if value else None
+
+    async def _run(self):
+        while True:
+            await self._wanted.wait()
+            previous = None
+            paced = False
+            with open(self.path, newline="") as f:
+                for i, row in enumerate(csv.DictReader(f)):
+                    at = self._time(row["timestamp"]) if row.get("timestamp") else None
+                    if self.speed and previous is not None and at is not None and at > previous:
+                        await asyncio.sleep((at - previous) / self.speed)
+                        paced = True
+                    elif i % 1000 == 999:
+                        await asyncio.sleep(0)
+                    previous = at if at is not None else previous
+                    if row["symbol"] in self.symbols:
+                        self._emit(Tick.now(
+                            row["symbol"],
+                            float(row["price"]),
+                            bid=self._float(row.get("bid")),
+                            ask=self._float(row.get("ask")),
+                            volume=self._float(row.get("volume"))
+                        ))
+            if not self.loop:
+                return
+            # yield between passes, even for a short file replayed as fast as possible
+            await asyncio.sleep(1 / self.speed if self.speed and not paced else 0)
+
+
+class AlpacaSource(MarketDataSource):
+    """Live stock quotes from the Alpaca data stream.
+
+    alpaca-py runs its own event loop, so the stream lives on a daemon
+    thread started with the first subscription, and quotes are handed
+    back to this loop.
+    """
+
+    name = "alpaca"
+
+    def __init__(self, api_key: str, secret_key: str):
+        super().__init__()
+        from alpaca.data.live import StockDataStream
+
+        self.stream = StockDataStream(api_key, secret_key)
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, emit: Emit):
+        await super().start(emit)
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        if self._thread:
+            await asyncio.to_thread(self.stream.stop)
+            self._thread = None
+        await super().stop()
+
+    async def _on_quote(self, quote):
+        bid, ask = quote.bid_price, quote.ask_price
+        price = (bid + ask) / 2 if bid and ask else bid or ask
+        tick = Tick.now(quote.symbol, price, bid=bid, ask=ask, timestamp=quote.timestamp.timestamp())
+        self._loop.call_soon_threadsafe(self._emit, tick)
+
+    async def subscribe(self, symbols: Iterable[str]):
+        new = [s for s in symbols if s not in self.symbols]
+        if not new:
+            return
+        await super().subscribe(new)
+        await asyncio.to_thread(self.stream.subscribe_quotes, self._on_quote, *new)
+        if not self._thread:
+            self._thread = threading.Thread(target=self.stream.run, daemon=True)
+            self._thread.start()
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        gone = [s for s in symbols if s in self.symbols]
+        if not gone:
+            return
+        await super().unsubscribe(gone)
+        await asyncio.to_thread(self.stream.unsubscribe_quotes, *gone)
+
+
+class CCXTSource(MarketDataSource):
+    """Live crypto tickers through a ccxt.pro exchange, one watcher per symbol"""
+
+    name = "ccxt"
+
+    def __init__(self, exchange: str = "binance"):
+        super().__init__()
+        import ccxt.pro as ccxtpro
+
+        self.exchange = getattr(ccxtpro, exchange)({"enableRateLimit": True})
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def stop(self):
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+        await self.exchange.close()
+        await super().stop()
+
+    async def _watch(self, symbol: str):
+        while True:
+            try:
+                ticker = await self.exchange.watch_ticker(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"CCXT ticker error for {symbol}: {e}")
+                await asyncio.sleep(1)
+                continue
+            if ticker.get("last") is None:
+                continue
+            self._emit(Tick.now(
+                symbol,
+                ticker["last"],
+                bid=ticker.get("bid"),
+                ask=ticker.get("ask"),
+                volume=ticker.get("baseVolume"),
+                timestamp=(ticker.get("timestamp") or 0) / 1000 or None
+            ))
+
+    async def subscribe(self, symbols: Iterable[str]):
+        await super().subscribe(symbols)
+        for symbol in symbols:
+            if symbol not in self._tasks:
+                self._tasks[symbol] = asyncio.create_task(self._watch(symbol))
+
+    async def unsubscribe(self, symbols: Iterable[str]):
+        await super().unsubscribe(symbols)
+        for symbol in symbols:
+            task = self._tasks.pop(symbol, None)
+            if task:
+                task.cancel()
+
+
+def create_source(name: str) -> Optional[MarketDataSource]:
+    """Source configured by ``MARKET_DATA_SOURCE``; None when disabled"""
+    if name == "synthetic":
+        return SyntheticSource(settings.MARKET_DATA_SYNTHETIC_RATE)
+    if name == "replay":
+        return ReplaySource(settings.MARKET_DATA_REPLAY_FILE, settings.MARKET_DATA_REPLAY_SPEED, loop=True)
+    if name == "alpaca":
+        return AlpacaSource(settings.ALPACA_API_KEY, settings.ALPACA_SECRET_KEY)
+    if name == "ccxt":
+        return CCXTSource(settings.CCXT_EXCHANGE)
+    if name not in ("", "none"):
+        raise ValueError(f"Unknown market data source: {name}")
+    return None
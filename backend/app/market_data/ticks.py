@@ -0,0 +1,35 @@
+from typing import NamedTuple, Optional
+import time
+
+
+class Tick(NamedTuple):
+    """A normalized quote from any market data source.
+
+    ``timestamp`` is the exchange time in epoch seconds and ``received``
+    the local ``time.monotonic()`` at ingestion, used for lag metrics.
+    """
+
+    symbol: str
+    price: float
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    volume: Optional[float] = None
+    timestamp: float = 0.0
+    received: float = 0.0
+
+    @classmethod
+    def now(cls, symbol: str, price: float, **fields) -> "Tick":
+        if fields.get("timestamp") is None:
+            fields["timestamp"] = time.time()
+        return cls(symbol, price, received=time.monotonic(), **fields)
+
+    def as_dict(self) -> dict:
+        """Payload of a ``price_update`` message"""
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "bid": self.bid,
+            "ask": self.ask,
+            "volume": self.volume,
+            "timestamp": int(self.timestamp * 1000),
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -33,6 +33,11 @@ class Order(Base):
     """Order model for trading operations"""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order history, newest first: all of a user's orders, or one status
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        Index("ix_orders_user_id_status_created_at", "user_id", "status", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -32,5 +32,18 @@ class Position(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # One row per holding; also serves every per-user position lookup
+        Index("uq_positions_user_id_symbol", "user_id", "symbol", unique=True),
+        # Active positions of a user, as listed by GET /positions/
+        Index(
+            "ix_positions_user_id_active",
+            "user_id",
+            "symbol",
+            postgresql_where=quantity > 0,
+            sqlite_where=quantity > 0
+        ),
+    )
+    
     def __repr__(self):
         return f"<Position(id={self.id}, symbol='{self.symbol}', quantity={self.quantity})>"
@@ -18,6 +18,7 @@ class PositionResponse(BaseModel):
     asset_type: str
     created_at: datetime
     updated_at: Optional[datetime]
+    price_updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
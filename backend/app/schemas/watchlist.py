@@ -16,6 +16,8 @@ class WatchlistItemResponse(BaseModel):
     symbol: str
     asset_type: str
     added_at: datetime
+    last_price: Optional[float] = None
+    price_updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
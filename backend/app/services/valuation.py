@@ -0,0 +1,283 @@
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy import Select, bindparam, case, select, update
+from sqlalchemy.orm import Session
+from app.market_data.quotes import QuoteCache, quote_cache
+from app.market_data.service import LEADER_LEASE
+from app.models.portfolio import Portfolio
+from app.models.position import Position
+import asyncio
+import numpy as np
+
+
+class PositionBook(NamedTuple):
+    """Open positions of one or many users as parallel arrays (one row per position).
+
+    ``symbol`` indexes into ``symbols``; ``fallback_price`` is the stored
+    price used when no fresh quote is cached; ``marked_price`` is the price
+    stored by the last end-of-day snapshot (NaN when never marked);
+    ``opened_today`` positions measure day P&L from their entry price
+    instead of the previous close.
+    """
+
+    user_id: np.ndarray
+    symbol: np.ndarray
+    quantity: np.ndarray
+    cost_basis: np.ndarray
+    entry_price: np.ndarray
+    fallback_price: np.ndarray
+    marked_price: np.ndarray
+    opened_today: np.ndarray
+    symbols: List[str]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, today=None) -> "PositionBook":
+        """Build from (user_id, symbol, quantity, cost_basis, average_entry_price,
+        current_price, created_at) rows
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        today = today or datetime.now(timezone.utc).date()
+        slots: Dict[str, int] = {}
+        symbol = np.array([slots.setdefault(r[1], len(slots)) for r in rows], dtype=np.int64)
+        entry = np.array([r[4] for r in rows], dtype=float)
+        stored = np.array([r[5] for r in rows], dtype=float)  # None becomes NaN
+        return cls(
+            user_id=np.array([r[0] for r in rows], dtype=np.int64),
+            symbol=symbol,
+            quantity=np.array([r[2] for r in rows], dtype=float),
+            cost_basis=np.array([r[3] for r in rows], dtype=float),
+            entry_price=entry,
+            fallback_price=np.where(np.isnan(stored), entry, stored),
+            marked_price=stored,
+            opened_today=np.array([r[6] is not None and r[6].date() >= today for r in rows], dtype=bool),
+            symbols=list(slots)
+        )
+
+
+class Valuation(NamedTuple):
+    """Per-user totals, aligned with ``user_id``"""
+
+    user_id: np.ndarray
+    market_value: np.ndarray
+    long_market_value: np.ndarray
+    short_market_value: np.ndarray
+    cost_basis: np.ndarray
+    unrealized_pl: np.ndarray
+    day_pl: np.ndarray
+    gross_exposure: np.ndarray
+    net_exposure: np.ndarray
+
+    def for_user(self, user_id: int) -> Dict[str, float]:
+        i = np.searchsorted(self.user_id, user_id)
+        if i == len(self.user_id) or self.user_id[i] != user_id:
+            return {field: 0.0 for field in self._fields[1:]}
+        return {field: float(getattr(self, field)[i]) for field in self._fields[1:]}
+
+
+def quote_prices(symbols: List[str], quotes: QuoteCache):
+    """Fresh last price and previous close per symbol (NaN when unknown)"""
+    slots = np.array([quotes.slots.get(s, -1) for s in symbols], dtype=np.int64)
+    known = slots >= 0
+    price = np.full(len(symbols), np.nan)
+    prev_close = np.full(len(symbols), np.nan)
+    if known.any():
+        idx = slots[known]
+        fresh = quotes.clock() - np.frombuffer(quotes.updated)[idx] <= quotes.ttl
+        price[known] = np.where(fresh, np.frombuffer(quotes.price)[idx], np.nan)
+        prev_close[known] = np.frombuffer(quotes.prev_close)[idx]
+    return price, prev_close
+
+
+def value_book(book: PositionBook, quotes: QuoteCache = quote_cache) -> Valuation:
+    """Value every position at the latest quote and total them per user in one pass.
+
+    Day P&L is measured from the cached previous close, or from the last
+    end-of-day mark when the cache has not rolled yet (e.g. after a
+    restart); a position with neither has no known day move.
+    """
+    last, prev_close = quote_prices(book.symbols, quotes)
+    price = last[book.symbol]
+    price = np.where(np.isnan(price), book.fallback_price, price)
+    reference = prev_close[book.symbol]
+    reference = np.where(np.isnan(reference), book.marked_price, reference)
+    reference = np.where(np.isnan(reference), price, reference)
+    reference = np.where(book.opened_today, book.entry_price, reference)
+
+    market_value = book.quantity * price
+    day_pl = book.quantity * (price - reference)
+
+    users, row_user = np.unique(book.user_id, return_inverse=True)
+
+    def total(values):
+        return np.bincount(row_user, weights=values, minlength=len(users))
+
+    long_mv = total(np.where(book.quantity > 0, market_value, 0.0))
+    short_mv = total(np.where(book.quantity < 0, market_value, 0.0))
+    cost_basis = total(book.cost_basis)
+    return Valuation(
+        user_id=users,
+        market_value=long_mv + short_mv,
+        long_market_value=long_mv,
+        short_market_value=short_mv,
+        cost_basis=cost_basis,
+        unrealized_pl=long_mv + short_mv - cost_basis,
+        day_pl=total(day_pl),
+        gross_exposure=long_mv - short_mv,
+        net_exposure=long_mv + short_mv
+    )
+
+
+def book_query(user_id: Optional[int] = None) -> Select:
+    """Open position rows of one user, or of everyone, in ``PositionBook`` order"""
+    query = select(
+        Position.user_id,
+        Position.symbol,
+        Position.quantity,
+        Position.cost_basis,
+        Position.average_entry_price,
+        Position.current_price,
+        Position.created_at
+    ).where(Position.quantity != 0)
+    if user_id is not None:
+        query = query.where(Position.user_id == user_id)
+    return query
+
+
+def load_book(db: Session, user_id: Optional[int] = None) -> PositionBook:
+    """Open positions of one user, or of everyone, with a sync session"""
+    return PositionBook.from_rows(db.execute(book_query(user_id)).all())
+
+
+def portfolio_values(cash_balance: float, totals: Dict[str, float]) -> Dict[str, float]:
+    """Portfolio columns derived from cash and the position totals"""
+    portfolio_value = cash_balance + totals["market_value"]
+    start_value = portfolio_value - totals["day_pl"]
+    return {
+        "portfolio_value": portfolio_value,
+        "long_market_value": totals["long_market_value"],
+        "short_market_value": totals["short_market_value"],
+        "total_pl": totals["unrealized_pl"],
+        "total_pl_percent": totals["unrealized_pl"] / totals["cost_basis"] * 100 if totals["cost_basis"] else 0.0,
+        "day_pl": totals["day_pl"],
+        "day_pl_percent": totals["day_pl"] / start_value * 100 if start_value else 0.0,
+    }
+
+
+# every open position in a symbol valued at its closing price
+mark_positions = (
+    update(Position.__table__)
+    .where(Position.symbol == bindparam("mark_symbol"), Position.quantity != 0)
+    .values(
+        current_price=bindparam("mark_price"),
+        market_value=Position.quantity * bindparam("mark_price"),
+        unrealized_pl=Position.quantity * bindparam("mark_price") - Position.cost_basis,
+        unrealized_pl_percent=case(
+            (Position.cost_basis != 0,
+             (Position.quantity * bindparam("mark_price") - Position.cost_basis) / Position.cost_basis * 100),
+            else_=0.0
+        )
+    )
+)
+
+
+def snapshot_portfolios(db: Session, quotes: QuoteCache = quote_cache) -> int:
+    """Value all users at once and store the results on their Portfolio rows.
+
+    Meant for end-of-day snapshots: open positions are also marked at their
+    last price, which later serves as the previous close. Returns the
+    number of portfolios updated.
+    """
+    book = load_book(db)
+    valuation = value_book(book, quotes)
+    rows = []
+    for portfolio_id, user_id, cash_balance in db.query(Portfolio.id, Portfolio.user_id, Portfolio.cash_balance):
+        values = portfolio_values(cash_balance or 0.0, valuation.for_user(user_id))
+        rows.append({"id": portfolio_id, **values})
+    if rows:
+        db.execute(update(Portfolio), rows)
+    last, _ = quote_prices(book.symbols, quotes)
+    marks = [{"mark_symbol": symbol, "mark_price": float(price)}
+             for symbol, price in zip(book.symbols, last) if not np.isnan(price)]
+    if marks:
+        db.execute(mark_positions, marks)
+    db.commit()
+    return len(rows)
+
+
+class EndOfDay:
+    """Daily close at ``at`` (UTC): snapshot every portfolio, then roll the quote cache.
+
+    The snapshot runs in a thread with its own sync session from
+    ``session_factory``, valuing a copy of the quote cache taken on the
+    event loop, which keeps updating the live one. Every worker rolls its
+    own cache; with a ``backplane`` only the holder of the market data
+    leader lease (taking it when free) writes the snapshot.
+    """
+
+    def __init__(
+        self,
+        at: time,
+        session_factory: Callable[[], Session],
+        quotes: QuoteCache = quote_cache,
+        backplane=None,
+        lease_ttl: float = 10.0
+    ):
+        self.at = at
+        self.session_factory = session_factory
+        self.quotes = quotes
+        self.backplane = backplane
+        self.lease_ttl = lease_ttl
+        self.last_run: Optional[datetime] = None
+        self.last_snapshot: Optional[datetime] = None
+        self.portfolios = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def seconds_until_next(self, now: datetime) -> float:
+        """Time from ``now`` (aware) to the next close"""
+        close = now.astimezone(timezone.utc).replace(
+            hour=self.at.hour, minute=self.at.minute, second=self.at.second, microsecond=0
+        )
+        if close <= now:
+            close += timedelta(days=1)
+        return (close - now).total_seconds()
+
+    async def run(self):
+        """Snapshot at the closing prices, which become the previous close"""
+        closing = self.quotes.copy()
+        self.quotes.roll_day()  # same prices as the copy: nothing ran in between
+        self.last_run = datetime.now(timezone.utc)
+        if self.backplane and not await self.backplane.acquire_lease(LEADER_LEASE, self.lease_ttl):
+            return
+
+        def snapshot():
+            with self.session_factory() as db:
+                return snapshot_portfolios(db, closing)
+
+        self.portfolios = await asyncio.to_thread(snapshot)
+        self.last_snapshot = datetime.now(timezone.utc)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.seconds_until_next(datetime.now(timezone.utc)))
+            try:
+                await self.run()
+            except Exception as e:
+                print(f"End-of-day snapshot error: {e}")
+
+    def metrics(self) -> dict:
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_snapshot": self.last_snapshot.isoformat() if self.last_snapshot else None,
+            "portfolios": self.portfolios,
+        }
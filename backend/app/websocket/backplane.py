@@ -0,0 +1,230 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import json
+import time
+import uuid
+
+Handler = Callable[[str, dict], Awaitable[None]]
+
+
+# every price update, for every symbol: each worker caches all quotes
+PRICES = "prices"
+# each worker's subscribed symbols, announced as a full set on change and periodically
+SYMBOLS = "symbols"
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class Backplane(ABC):
+    """Pub/sub bus shared by all workers serving WebSockets.
+
+    Each worker publishes an update once and receives the channels it
+    subscribed to, then fans out to its own sockets: every worker listens
+    on ``PRICES`` (so its quote cache sees every tick) and on the channels
+    of users with local connections. ``subscribe``/``unsubscribe`` are synchronous
+    and only record the wanted channels; implementations apply them
+    asynchronously in order.
+
+    Leases elect the one worker that does a job for all of them, such as
+    ingesting market data.
+    """
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.channels: Set[str] = set()
+        self.published = 0
+        self.received = 0
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler):
+        """Start delivering messages of subscribed channels to ``handler``"""
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    def subscribe(self, channel: str):
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+
+    @abstractmethod
+    async def publish(self, channel: str, payload: dict):
+        """Deliver ``payload`` to every backplane subscribed to ``channel``"""
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, ttl: float) -> bool:
+        """Take or renew the lease ``name`` for ``ttl`` seconds; False while another worker holds it"""
+
+    @abstractmethod
+    async def release_lease(self, name: str):
+        """Give up the lease ``name`` if this worker holds it"""
+
+    async def _dispatch(self, channel: str, payload: dict):
+        if self._handler and channel in self.channels:
+            self.received += 1
+            await self._handler(channel, payload)
+
+
+class InMemoryBackplane(Backplane):
+    """In-process stand-in: backplanes sharing a ``hub`` (and ``leases``)
+    behave like workers connected to the same Redis.
+    """
+
+    def __init__(
+        self,
+        hub: Optional[Dict[str, Set["InMemoryBackplane"]]] = None,
+        leases: Optional[Dict[str, Tuple[str, float]]] = None,
+        clock=time.monotonic
+    ):
+        super().__init__()
+        self.hub = hub if hub is not None else {}
+        self.leases = leases if leases is not None else {}  # name -> (worker id, expiry)
+        self.clock = clock
+
+    def subscribe(self, channel: str):
+        super().subscribe(channel)
+        self.hub.setdefault(channel, set()).add(self)
+
+    def unsubscribe(self, channel: str):
+        super().unsubscribe(channel)
+        members = self.hub.get(channel)
+        if members is not None:
+            members.discard(self)
+            if not members:
+                del self.hub[channel]
+
+    async def stop(self):
+        for channel in list(self.channels):
+            self.unsubscribe(channel)
+        await super().stop()
+
+    async def publish(self, channel: str, payload: dict):
+        self.published += 1
+        # round-trip through JSON like the Redis backplane does
+        data = json.loads(json.dumps(payload))
+        for backplane in list(self.hub.get(channel, ())):
+            await backplane._dispatch(channel, data)
+
+    async def acquire_lease(self, name: str, ttl: float) -> bool:
+        now = self.clock()
+        owner, expiry = self.leases.get(name, (None, 0.0))
+        if owner != self.worker_id and expiry > now:
+            return False
+        self.leases[name] = (self.worker_id, now + ttl)
+        return True
+
+    async def release_lease(self, name: str):
+        if self.leases.get(name, (None,))[0] == self.worker_id:
+            del self.leases[name]
+
+
+# compare-and-set on the lease holder, atomic on the Redis side
+RENEW_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+return 0
+"""
+RELEASE_LEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end
+return 0
+"""
+
+
+class RedisBackplane(Backplane):
+    """Backplane over Redis pub/sub (``REDIS_URL``).
+
+    A single reader task owns the pub/sub connection: it applies pending
+    channel changes, then reads messages and dispatches them.
+    """
+
+    def __init__(self, url: str, poll_interval: float = 0.1):
+        super().__init__()
+        self.url = url
+        self.poll_interval = poll_interval
+        self._subscribed: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.redis = None
+        self.pubsub = None
+
+    async def start(self, handler: Handler):
+        import redis.asyncio as redis
+
+        await super().start(handler)
+        self.redis = redis.from_url(self.url)
+        self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self._task = asyncio.create_task(self._reader())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.pubsub:
+            await self.pubsub.close()
+        if self.redis:
+            await self.redis.close()
+        await super().stop()
+
+    def subscribe(self, channel: str):
+        super().subscribe(channel)
+        self._changed.set()
+
+    def unsubscribe(self, channel: str):
+        super().unsubscribe(channel)
+        self._changed.set()
+
+    async def publish(self, channel: str, payload: dict):
+        self.published += 1
+        await self.redis.publish(channel, json.dumps(payload, separators=(",", ":")))
+
+    async def acquire_lease(self, name: str, ttl: float) -> bool:
+        ms = int(ttl * 1000)
+        if await self.redis.set(name, self.worker_id, nx=True, px=ms):
+            return True
+        return bool(await self.redis.eval(RENEW_LEASE, 1, name, self.worker_id, ms))
+
+    async def release_lease(self, name: str):
+        await self.redis.eval(RELEASE_LEASE, 1, name, self.worker_id)
+
+    async def _apply_changes(self):
+        self._changed.clear()
+        added = self.channels - self._subscribed
+        removed = self._subscribed - self.channels
+        try:
+            # channels changed during these awaits are picked up on the next pass
+            if added:
+                await self.pubsub.subscribe(*added)
+                self._subscribed |= added
+            if removed:
+                await self.pubsub.unsubscribe(*removed)
+                self._subscribed -= removed
+        except Exception:
+            self._changed.set()
+            raise
+
+    async def _reader(self):
+        while True:
+            try:
+                if self._changed.is_set():
+                    await self._apply_changes()
+                if not self._subscribed:
+                    await self._changed.wait()
+                    continue
+                message = await self.pubsub.get_message(timeout=self.poll_interval)
+                if message and message["type"] == "message":
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    await self._dispatch(channel, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Redis backplane error: {e}")
+                await asyncio.sleep(1)
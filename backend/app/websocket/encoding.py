@@ -0,0 +1,51 @@
+from typing import Callable, Dict, Optional, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional codec
+    msgpack = None
+
+
+Frame = Union[str, bytes]
+
+
+class Codec:
+    """Wire encoding for outgoing WebSocket messages.
+
+    Text codecs produce ``str`` frames, binary codecs ``bytes`` frames;
+    the connection writer picks send_text or send_bytes accordingly.
+    """
+
+    def __init__(self, name: str, encode: Callable[[dict], Frame], binary: bool = False):
+        self.name = name
+        self.encode = encode
+        self.binary = binary
+
+    def __repr__(self):
+        return f"<Codec({self.name})>"
+
+
+def _encode_json(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"))
+
+
+def _encode_orjson(message: dict) -> str:
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+JSON = Codec("json", _encode_orjson if orjson else _encode_json)
+
+CODECS: Dict[str, Codec] = {"json": JSON}
+if msgpack:
+    CODECS["msgpack"] = Codec("msgpack", lambda m: msgpack.packb(m, use_bin_type=True), binary=True)
+
+
+def get_codec(name: Optional[str]) -> Codec:
+    """Codec negotiated by the client; JSON when unknown or unavailable"""
+    return CODECS.get((name or "").lower(), JSON)
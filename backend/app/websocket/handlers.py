@@ -1,47 +1,114 @@
 from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from typing import List, Optional
+from app.database import AsyncSessionLocal
+from app.models.watchlist import Watchlist, WatchlistItem
+from app.websocket.encoding import get_codec
 from app.websocket.manager import manager
 import json
 
 
+async def get_watchlist_symbols(user_id: int, watchlist_id: int) -> Optional[List[str]]:
+    """Symbols of a user's watchlist, or None if it does not exist"""
+    async with AsyncSessionLocal() as db:
+        watchlist = await db.scalar(select(Watchlist.id).where(
+            Watchlist.id == watchlist_id,
+            Watchlist.user_id == user_id
+        ))
+        if not watchlist:
+            return None
+        symbols = await db.scalars(select(WatchlistItem.symbol).where(
+            WatchlistItem.watchlist_id == watchlist_id
+        ))
+        return symbols.all()
+
+
+def message_symbols(message: dict) -> List[str]:
+    """Symbols of a subscribe/unsubscribe message: 'symbols' list or single 'symbol'"""
+    symbols = message.get('symbols')
+    if isinstance(symbols, list):
+        return [s for s in symbols if isinstance(s, str)]
+    symbol = message.get('symbol')
+    return [symbol] if symbol else []
+
+
 async def handle_websocket(websocket: WebSocket, user_id: int):
     """Handle WebSocket connection for a user"""
     
-    await manager.connect(websocket, user_id)
+    # Clients may opt into price conflation with ?conflate_ms=<interval>
+    # and into a binary wire format with ?encoding=msgpack
+    conflate_ms = websocket.query_params.get('conflate_ms')
+    connection = await manager.connect(
+        websocket,
+        user_id,
+        conflation_ms=int(conflate_ms) if conflate_ms and conflate_ms.isdigit() else None,
+        codec=get_codec(websocket.query_params.get('encoding'))
+    )
     
     try:
-        while True:
+        while not connection.closed:
             # Receive messages from client
             data = await websocket.receive_text()
+            if connection.closed:
+                # dropped as a slow client while waiting; don't subscribe it again
+                break
             message = json.loads(data)
             
             action = message.get('action')
             
             if action == 'subscribe':
-                # Subscribe to symbol updates
-                symbol = message.get('symbol')
-                if symbol:
-                    manager.subscribe(user_id, symbol)
-                    await websocket.send_json({
+                # Subscribe to one symbol or a batch, acked once with a quote snapshot
+                symbols = manager.subscribe_many(user_id, message_symbols(message))
+                if symbols:
+                    ack = {'event': 'subscribed'}
+                    if 'symbols' in message:
+                        ack['symbols'] = symbols
+                    else:
+                        ack['symbol'] = symbols[0]
+                    ack['snapshot'] = manager.snapshot(symbols)
+                    connection.send(ack)
+            
+            elif action == 'subscribe_watchlist':
+                # Subscribe to every symbol of one of the user's watchlists
+                watchlist_id = message.get('watchlist_id')
+                symbols = None
+                if isinstance(watchlist_id, int):
+                    symbols = await get_watchlist_symbols(user_id, watchlist_id)
+                if connection.closed:
+                    break
+                if symbols is None:
+                    connection.send({
+                        'event': 'error',
+                        'message': 'Watchlist not found',
+                        'watchlist_id': watchlist_id
+                    })
+                else:
+                    symbols = manager.subscribe_many(user_id, symbols)
+                    connection.send({
                         'event': 'subscribed',
-                        'symbol': symbol
+                        'watchlist_id': watchlist_id,
+                        'symbols': symbols,
+                        'snapshot': manager.snapshot(symbols)
                     })
             
             elif action == 'unsubscribe':
-                # Unsubscribe from symbol updates
-                symbol = message.get('symbol')
-                if symbol:
-                    manager.unsubscribe(user_id, symbol)
-                    await websocket.send_json({
-                        'event': 'unsubscribed',
-                        'symbol': symbol
-                    })
+                # Unsubscribe from one symbol or a batch
+                symbols = manager.unsubscribe_many(user_id, message_symbols(message))
+                if symbols:
+                    ack = {'event': 'unsubscribed'}
+                    if 'symbols' in message:
+                        ack['symbols'] = symbols
+                    else:
+                        ack['symbol'] = symbols[0]
+                    connection.send(ack)
             
             elif action == 'ping':
                 # Respond to ping to keep connection alive
-                await websocket.send_json({'event': 'pong'})
+                connection.send({'event': 'pong'})
     
     except WebSocketDisconnect:
-        manager.disconnect(user_id)
+        pass
     except Exception as e:
         print(f"WebSocket error for user {user_id}: {e}")
-        manager.disconnect(user_id)
+    finally:
+        manager.disconnect(user_id, connection)
@@ -1,81 +1,465 @@
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from collections import deque
+from app.core.config import settings
+from app.market_data.quotes import QuoteCache, quote_cache
+from app.websocket.backplane import PRICES, SYMBOLS, Backplane, user_channel
+from app.websocket.encoding import Codec, Frame, JSON
 import asyncio
-import json
+import time
+
+
+class ClientConnection:
+    """A WebSocket with a bounded outbound queue drained by its own writer task.
+
+    Producers never await the socket: they enqueue pre-encoded frames and
+    return immediately, so one slow client cannot stall a broadcast. When
+    the queue is full the oldest price frame is dropped (a newer quote
+    follows); order updates and acks are never dropped. A client that keeps
+    falling behind past ``max_dropped`` frames, or whose queue fills with
+    frames that cannot be dropped, is disconnected with close code 1013.
+
+    With ``conflation_ms`` set, price updates bypass the queue: only the
+    latest frame per symbol is kept pending and pending prices are flushed
+    at most once per interval, so a burst of ticks costs one frame per
+    symbol and the client always gets the freshest quote. Other frames
+    (order updates, acks, pongs) are never held back by the interval.
+
+    Frames are pre-encoded with the connection's ``codec`` (JSON text or a
+    binary encoding such as msgpack, negotiated at connect time).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        max_queue: int = settings.WS_SEND_QUEUE_SIZE,
+        max_dropped: int = settings.WS_MAX_DROPPED_MESSAGES,
+        conflation_ms: int = settings.WS_PRICE_CONFLATION_MS,
+        codec: Codec = JSON,
+        on_close: Optional[Callable[["ClientConnection"], None]] = None,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.codec = codec
+        self.max_queue = max_queue
+        self.max_dropped = max_dropped
+        self.queue: Deque[Tuple[Frame, bool]] = deque()  # (frame, is_price)
+        self.conflation_interval = conflation_ms / 1000
+        self.latest_prices: Dict[str, Frame] = {}
+        self.dropped = 0
+        self.conflated = 0
+        self.sent = 0
+        self.closed = False
+        self._on_close = on_close
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task"""
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: Frame, is_price: bool = False) -> bool:
+        """Queue a pre-encoded frame without blocking; False if the client is gone"""
+        if self.closed:
+            return False
+        if len(self.queue) >= self.max_queue:
+            if not self._drop_oldest_price():
+                print(f"Disconnecting client for user {self.user_id}: send queue full")
+                self.close(code=1013)
+                return False
+            self.dropped += 1
+            if self.dropped > self.max_dropped:
+                print(f"Disconnecting slow client for user {self.user_id}")
+                self.close(code=1013)
+                return False
+        self.queue.append((frame, is_price))
+        self._wakeup.set()
+        return True
+
+    def _drop_oldest_price(self) -> bool:
+        for i, (_, is_price) in enumerate(self.queue):
+            if is_price:
+                del self.queue[i]
+                return True
+        return False
+
+    def enqueue_price(self, symbol: str, frame: Frame) -> bool:
+        """Queue a price frame, replacing any pending one for the symbol when conflating"""
+        if not self.conflation_interval:
+            return self.enqueue(frame, is_price=True)
+        if self.closed:
+            return False
+        if symbol in self.latest_prices:
+            self.conflated += 1
+        self.latest_prices[symbol] = frame
+        self._wakeup.set()
+        return True
+
+    def send(self, message: dict) -> bool:
+        """Encode and queue a message for this connection only"""
+        return self.enqueue(self.codec.encode(message))
+
+    async def _writer(self):
+        send = self.websocket.send_bytes if self.codec.binary else self.websocket.send_text
+        loop = asyncio.get_running_loop()
+        next_flush = 0.0
+        try:
+            while True:
+                # pending prices wait for their flush; any other frame wakes the writer at once
+                delay = next_flush - loop.time() if self.latest_prices else None
+                if delay is None:
+                    await self._wakeup.wait()
+                elif delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                self._wakeup.clear()
+                while self.queue:
+                    await send(self.queue.popleft()[0])
+                    self.sent += 1
+                if self.latest_prices and loop.time() >= next_flush:
+                    pending, self.latest_prices = self.latest_prices, {}
+                    for frame in pending.values():
+                        await send(frame)
+                        self.sent += 1
+                    # ticks arriving meanwhile overwrite each other until the next flush
+                    next_flush = loop.time() + self.conflation_interval
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error sending to user {self.user_id}: {e}")
+            self.close(code=1011)
+
+    def close(self, code: Optional[int] = None):
+        """Stop the writer and drop pending frames.
+
+        With a ``code`` the server is the one giving up on the client, so the
+        socket is closed too; the receive loop then ends with a disconnect.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.latest_prices.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if code is not None:
+            self._closing = asyncio.create_task(self._close_socket(code))
+        if self._on_close:
+            self._on_close(self)
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass  # already gone
 
 
 class ConnectionManager:
-    """WebSocket connection manager for real-time updates"""
-    
-    def __init__(self):
-        self.active_connections: Dict[int, WebSocket] = {}
+    """WebSocket connection manager for real-time updates.
+
+    Subscriptions are indexed both ways (symbol -> users and user -> symbols)
+    so disconnecting costs O(symbols of that user), and empty entries are
+    removed. A user may hold several connections at once (tabs, devices);
+    they share the user's subscriptions, which are dropped with the last one.
+
+    With a ``backplane`` (multiple workers), updates are published once to
+    the bus and every worker, this one included, fans them out to its own
+    sockets. Every worker receives all price updates, so its quote cache is
+    complete whichever symbols its clients watch; personal messages only
+    reach workers with connections of that user. Workers also announce
+    their subscribed symbols every ``announce_interval`` seconds and on
+    change, so each one knows the symbols wanted anywhere; a worker that
+    stops announcing is forgotten after three intervals.
+    """
+
+    def __init__(
+        self,
+        quotes: Optional[QuoteCache] = None,
+        announce_interval: float = settings.WS_BACKPLANE_ANNOUNCE_SECONDS
+    ):
+        self.active_connections: Dict[int, Set[ClientConnection]] = {}
         self.subscriptions: Dict[str, Set[int]] = {}
-    
-    async def connect(self, websocket: WebSocket, user_id: int):
+        self.user_symbols: Dict[int, Set[str]] = {}
+        self.quotes = quotes if quotes is not None else QuoteCache()
+        self.backplane: Optional[Backplane] = None
+        self.announce_interval = announce_interval
+        # with a backplane: worker id -> (expiry, its symbols), and their union
+        self.worker_symbols: Dict[str, Tuple[float, Set[str]]] = {}
+        self.cluster_symbols: Set[str] = set()
+        self._symbols_changed = asyncio.Event()
+        self._announcer: Optional[asyncio.Task] = None
+        # called with (symbol, True) on its first subscriber and (symbol, False) after its last,
+        # counting the subscribers of every worker when there is a backplane
+        self.symbol_listeners: List[Callable[[str, bool], None]] = []
+
+    async def start(self, backplane: Backplane):
+        """Route updates through ``backplane`` and listen on the current channels"""
+        self.backplane = backplane
+        await backplane.start(self._on_backplane_message)
+        backplane.subscribe(PRICES)
+        backplane.subscribe(SYMBOLS)
+        for user_id in self.active_connections:
+            backplane.subscribe(user_channel(user_id))
+        self._symbols_changed.set()
+        self._announcer = asyncio.create_task(self._announce_symbols())
+
+    async def stop(self):
+        """Detach from the backplane and deliver updates locally again"""
+        backplane, self.backplane = self.backplane, None
+        if backplane:
+            self._announcer.cancel()
+            try:
+                # let the other workers forget our symbols now rather than on expiry
+                await backplane.publish(SYMBOLS, {'worker': backplane.worker_id, 'symbols': []})
+            except Exception as e:
+                print(f"Error announcing symbols: {e}")
+            await backplane.stop()
+            self.worker_symbols.clear()
+            self.cluster_symbols.clear()
+
+    def wanted_symbols(self) -> Set[str]:
+        """Symbols with a subscriber on any worker (on this one without a backplane)"""
+        return set(self.cluster_symbols if self.backplane else self.subscriptions)
+
+    async def _announce_symbols(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # announce on change, and at least once per interval as a heartbeat
+            heartbeat = loop.call_later(self.announce_interval, self._symbols_changed.set)
+            try:
+                await self._symbols_changed.wait()
+            finally:
+                heartbeat.cancel()
+            self._symbols_changed.clear()
+            self._update_cluster_symbols()
+            try:
+                await self.backplane.publish(SYMBOLS, {
+                    'worker': self.backplane.worker_id,
+                    'symbols': list(self.subscriptions)
+                })
+            except Exception as e:
+                print(f"Error announcing symbols: {e}")
+
+    def _update_cluster_symbols(self):
+        now = time.monotonic()
+        for worker, (expiry, _) in list(self.worker_symbols.items()):
+            if expiry < now:
+                del self.worker_symbols[worker]
+        wanted = set().union(*(symbols for _, symbols in self.worker_symbols.values()))
+        removed = self.cluster_symbols - wanted
+        added = wanted - self.cluster_symbols
+        self.cluster_symbols = wanted
+        for symbol in removed:
+            self._notify_symbol(symbol, False)
+        for symbol in added:
+            self._notify_symbol(symbol, True)
+
+    def _notify_symbol(self, symbol: str, active: bool):
+        for listener in self.symbol_listeners:
+            listener(symbol, active)
+
+    def _local_symbol_changed(self, symbol: str, active: bool):
+        if self.backplane:
+            # listeners hear about it once the announcement comes back through the backplane
+            self._symbols_changed.set()
+        else:
+            self._notify_symbol(symbol, active)
+
+    async def _on_backplane_message(self, channel: str, payload: dict):
+        if channel == PRICES:
+            self._fan_out_price(payload['symbol'], payload['data'])
+            return
+        if channel == SYMBOLS:
+            if payload['symbols']:
+                expiry = time.monotonic() + 3 * self.announce_interval
+                self.worker_symbols[payload['worker']] = (expiry, set(payload['symbols']))
+            else:
+                self.worker_symbols.pop(payload['worker'], None)
+            self._update_cluster_symbols()
+            return
+        kind, _, key = channel.partition(':')
+        if kind == 'user':
+            self._deliver_personal(int(key), payload)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        conflation_ms: Optional[int] = None,
+        codec: Codec = JSON
+    ) -> ClientConnection:
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-    
-    def disconnect(self, user_id: int):
-        """Disconnect a user and remove all their subscriptions"""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        
-        # Remove from all subscriptions
-        for symbol in self.subscriptions:
-            self.subscriptions[symbol].discard(user_id)
-    
+        if conflation_ms is None:
+            conflation_ms = settings.WS_PRICE_CONFLATION_MS
+        connection = ClientConnection(
+            websocket,
+            user_id,
+            conflation_ms=conflation_ms,
+            codec=codec,
+            on_close=self._connection_closed
+        )
+        connection.start()
+        if user_id not in self.active_connections:
+            self.active_connections[user_id] = set()
+            if self.backplane:
+                self.backplane.subscribe(user_channel(user_id))
+        self.active_connections[user_id].add(connection)
+        return connection
+
+    def _connection_closed(self, connection: ClientConnection):
+        self.disconnect(connection.user_id, connection)
+
+    def disconnect(self, user_id: int, connection: Optional[ClientConnection] = None):
+        """Close one connection of a user, or all of them when none is given.
+
+        The user's subscriptions are removed once no connection is left.
+        """
+        connections = self.active_connections.get(user_id)
+        if connections is not None:
+            closing = [connection] if connection else list(connections)
+            for conn in closing:
+                connections.discard(conn)
+                conn.close()
+            if connections:
+                return
+            if self.active_connections.pop(user_id, None) is not None and self.backplane:
+                self.backplane.unsubscribe(user_channel(user_id))
+
+        for symbol in self.user_symbols.pop(user_id, ()):
+            self._discard_subscriber(symbol, user_id)
+
+    def _discard_subscriber(self, symbol: str, user_id: int):
+        subscribers = self.subscriptions.get(symbol)
+        if subscribers is None:
+            return
+        subscribers.discard(user_id)
+        if not subscribers:
+            del self.subscriptions[symbol]
+            self._local_symbol_changed(symbol, False)
+
+    def _add_subscriber(self, symbol: str, user_id: int):
+        subscribers = self.subscriptions.get(symbol)
+        if subscribers is None:
+            subscribers = self.subscriptions[symbol] = set()
+            self._local_symbol_changed(symbol, True)
+        subscribers.add(user_id)
+
     def subscribe(self, user_id: int, symbol: str):
         """Subscribe a user to price updates for a symbol"""
-        if symbol not in self.subscriptions:
-            self.subscriptions[symbol] = set()
-        self.subscriptions[symbol].add(user_id)
-    
+        self._add_subscriber(symbol, user_id)
+        self.user_symbols.setdefault(user_id, set()).add(symbol)
+
     def unsubscribe(self, user_id: int, symbol: str):
         """Unsubscribe a user from price updates for a symbol"""
-        if symbol in self.subscriptions:
-            self.subscriptions[symbol].discard(user_id)
-    
+        self._discard_subscriber(symbol, user_id)
+        symbols = self.user_symbols.get(user_id)
+        if symbols is not None:
+            symbols.discard(symbol)
+            if not symbols:
+                del self.user_symbols[user_id]
+
+    def subscribe_many(self, user_id: int, symbols: Iterable[str]) -> List[str]:
+        """Subscribe a user to several symbols at once; returns them de-duplicated"""
+        symbols = list(dict.fromkeys(s for s in symbols if s))
+        if not symbols:
+            return symbols
+        for symbol in symbols:
+            self._add_subscriber(symbol, user_id)
+        self.user_symbols.setdefault(user_id, set()).update(symbols)
+        return symbols
+
+    def unsubscribe_many(self, user_id: int, symbols: Iterable[str]) -> List[str]:
+        """Unsubscribe a user from several symbols at once"""
+        symbols = list(dict.fromkeys(s for s in symbols if s))
+        for symbol in symbols:
+            self.unsubscribe(user_id, symbol)
+        return symbols
+
+    def snapshot(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """Latest cached quote for each symbol that has a fresh one"""
+        return self.quotes.snapshot(symbols)
+
+    def _cache_quote(self, symbol: str, data: dict):
+        price = data.get('price')
+        if price is not None:
+            self.quotes.update(symbol, price, data.get('bid'), data.get('ask'))
+
+    def metrics(self) -> dict:
+        """Connection and delivery counters for the metrics endpoint"""
+        connections = [c for conns in self.active_connections.values() for c in conns]
+        return {
+            "users": len(self.active_connections),
+            "connections": len(connections),
+            "symbols": len(self.subscriptions),
+            "cluster_symbols": len(self.cluster_symbols) if self.backplane else None,
+            "queued": sum(len(c.queue) + len(c.latest_prices) for c in connections),
+            "sent": sum(c.sent for c in connections),
+            "dropped": sum(c.dropped for c in connections),
+            "conflated": sum(c.conflated for c in connections),
+        }
+
     async def broadcast_price_update(self, symbol: str, data: dict):
-        """Broadcast price update to all subscribed users"""
-        if symbol not in self.subscriptions:
+        """Broadcast price update to all subscribed users, on every worker"""
+        if self.backplane:
+            await self.backplane.publish(PRICES, {'symbol': symbol, 'data': data})
+        else:
+            self._fan_out_price(symbol, data)
+
+    def _fan_out_price(self, symbol: str, data: dict):
+        """Queue a price update on this worker's subscribed connections.
+
+        The message is encoded once per codec in use; delivery happens on
+        the per-connection writer tasks.
+        """
+        self._cache_quote(symbol, data)
+        subscribers = self.subscriptions.get(symbol)
+        if not subscribers:
             return
-        
-        disconnected_users = []
-        
-        for user_id in self.subscriptions[symbol]:
-            if user_id in self.active_connections:
-                websocket = self.active_connections[user_id]
-                try:
-                    await websocket.send_json({
-                        'event': 'price_update',
-                        'data': data
-                    })
-                except Exception as e:
-                    print(f"Error sending to user {user_id}: {e}")
-                    disconnected_users.append(user_id)
-        
-        # Clean up disconnected users
-        for user_id in disconnected_users:
-            self.disconnect(user_id)
-    
+
+        message = {
+            'event': 'price_update',
+            'data': data
+        }
+        frames: Dict[str, Frame] = {}
+
+        for user_id in list(subscribers):
+            for connection in list(self.active_connections.get(user_id, ())):
+                codec = connection.codec
+                frame = frames.get(codec.name)
+                if frame is None:
+                    frame = frames[codec.name] = codec.encode(message)
+                connection.enqueue_price(symbol, frame)
+
     async def send_personal_message(self, user_id: int, message: dict):
-        """Send a message to a specific user"""
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                print(f"Error sending personal message to user {user_id}: {e}")
-                self.disconnect(user_id)
-    
+        """Send a message to every connection of a specific user, on every worker"""
+        if self.backplane:
+            await self.backplane.publish(user_channel(user_id), message)
+        else:
+            self._deliver_personal(user_id, message)
+
+    def _deliver_personal(self, user_id: int, message: dict):
+        connections = self.active_connections.get(user_id)
+        if not connections:
+            return
+        frames: Dict[str, Frame] = {}
+        for connection in list(connections):
+            codec = connection.codec
+            if codec.name not in frames:
+                frames[codec.name] = codec.encode(message)
+            connection.enqueue(frames[codec.name])
+
     async def broadcast_order_update(self, user_id: int, order_data: dict):
         """Send order update to a specific user"""
         await self.send_personal_message(user_id, {
             'event': 'order_update',
             'data': order_data
         })
-    
+
     async def broadcast_portfolio_update(self, user_id: int, portfolio_data: dict):
         """Send portfolio update to a specific user"""
         await self.send_personal_message(user_id, {
@@ -84,5 +468,5 @@ class ConnectionManager:
         })
 
 
-# Global connection manager instance
-manager = ConnectionManager()
+# Global connection manager instance, writing to the shared quote cache
+manager = ConnectionManager(quote_cache)
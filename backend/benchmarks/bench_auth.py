@@ -0,0 +1,65 @@
+"""Auth dependency overhead per request: token decode + users query vs the auth cache.
+
+Each iteration opens a session like a request would and resolves the
+current user. Run from backend/: python -m benchmarks.bench_auth [requests]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DEBUG", "false")  # engine echo would dominate the timings
+
+from jose import jwt  # noqa: E402
+
+from app.api.v1.endpoints.auth import create_access_token, get_current_user  # noqa: E402
+from app.core.auth_cache import auth_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+async def uncached_user(token, db):
+    """The dependency before the cache: verify the signature, then query"""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return await db.get(User, int(payload["sub"]))
+
+
+async def per_request(resolve, token, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        async with AsyncSessionLocal() as db:
+            user = await resolve(token, db)
+    assert user.username == "bench"
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int = 5000):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        user = User(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+    token = create_access_token({"sub": str(user.id)})
+
+    async def dependency(token, db):
+        return await get_current_user(token, db)
+
+    uncached = await per_request(uncached_user, token, requests)
+    ttl, auth_cache.ttl = auth_cache.ttl, 0
+    tokens_only = await per_request(dependency, token, requests)
+    auth_cache.ttl = ttl
+    cached = await per_request(dependency, token, requests)
+
+    print(f"{requests} requests, one user, in-memory SQLite (a networked database adds a round trip per query)")
+    print(f"decode + users query:        {uncached:7.1f} us/request")
+    print(f"token LRU + users query:     {tokens_only:7.1f} us/request")
+    print(f"token LRU + user cache:      {cached:7.1f} us/request")
+    print(auth_cache.metrics())
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
@@ -0,0 +1,81 @@
+"""Broadcast fan-out benchmark with simulated subscribers.
+
+Run from backend/: python -m benchmarks.bench_broadcast [subscribers] [ticks]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.websocket.manager import ConnectionManager  # noqa: E402
+
+
+class SimulatedWebSocket:
+    """Accepts frames with a small per-send cost, like a real socket write"""
+
+    def __init__(self, slow: bool = False):
+        self.slow = slow
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.slow:
+            await asyncio.sleep(0.01)
+        self.received += 1
+
+    async def send_bytes(self, data: bytes):
+        await self.send_text(data)
+
+    async def send_json(self, data: dict):
+        await self.send_text(json.dumps(data, separators=(",", ":")))
+
+
+async def legacy_broadcast(sockets, data):
+    """The previous behaviour: sequential awaits, JSON encoded per recipient"""
+    for websocket in sockets:
+        await websocket.send_json({'event': 'price_update', 'data': data})
+
+
+async def main(subscribers: int = 10_000, ticks: int = 20):
+    data = {"symbol": "AAPL", "price": 189.25, "bid": 189.24, "ask": 189.26,
+            "volume": 1200, "timestamp": "2024-01-02T15:30:00Z"}
+    slow_every = 1000
+
+    sockets = [SimulatedWebSocket(slow=i % slow_every == 0) for i in range(subscribers)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        await legacy_broadcast(sockets, data)
+    legacy = (time.perf_counter() - start) / ticks
+
+    manager = ConnectionManager()
+    sockets = [SimulatedWebSocket(slow=i % slow_every == 0) for i in range(subscribers)]
+    for user_id, websocket in enumerate(sockets):
+        connection = await manager.connect(websocket, user_id)
+        connection.max_queue = ticks * 2
+        manager.subscribe(user_id, "AAPL")
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        await manager.broadcast_price_update("AAPL", data)
+    enqueue = (time.perf_counter() - start) / ticks
+    fast = [ws for ws in sockets if not ws.slow]
+    while any(ws.received < ticks for ws in fast):
+        await asyncio.sleep(0)
+    delivered = (time.perf_counter() - start) / ticks
+
+    print(f"{subscribers} subscribers, {subscribers // slow_every} slow, {ticks} ticks")
+    print(f"legacy sequential send_json: {legacy * 1e3:8.2f} ms per tick")
+    print(f"queued broadcast (enqueue):  {enqueue * 1e3:8.2f} ms per tick")
+    print(f"queued broadcast (delivered to fast clients): {delivered * 1e3:8.2f} ms per tick")
+    for user_id in list(manager.active_connections):
+        manager.disconnect(user_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
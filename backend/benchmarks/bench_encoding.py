@@ -0,0 +1,48 @@
+"""Wire encoding benchmark: encode cost and bytes per price tick.
+
+Run from backend/: python -m benchmarks.bench_encoding [ticks]
+"""
+import json
+import os
+import sys
+import time
+import zlib
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.websocket.encoding import CODECS, _encode_json  # noqa: E402
+
+
+def deflated(frames) -> float:
+    """Mean permessage-deflate payload per frame with context takeover"""
+    compressor = zlib.compressobj(wbits=-15)
+    total = 0
+    for frame in frames:
+        data = frame.encode() if isinstance(frame, str) else frame
+        total += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total / len(frames)
+
+
+def main(ticks: int = 100_000):
+    messages = [{
+        "event": "price_update",
+        "data": {"symbol": "AAPL", "price": 189.25 + i / 100, "bid": 189.24, "ask": 189.26,
+                 "volume": 1200 + i, "timestamp": "2024-01-02T15:30:00Z"},
+    } for i in range(ticks)]
+
+    encoders = [("stdlib json", _encode_json)]
+    encoders += [(name, codec.encode) for name, codec in CODECS.items()]
+    print(f"{ticks} ticks")
+    print(f"{'codec':<12} {'us/tick':>8} {'bytes':>6} {'deflated':>9}")
+    for name, encode in encoders:
+        start = time.perf_counter()
+        frames = [encode(message) for message in messages]
+        elapsed = time.perf_counter() - start
+        size = sum(map(len, frames)) / ticks
+        print(f"{name:<12} {elapsed / ticks * 1e6:8.2f} {size:6.0f} {deflated(frames[:10_000]):9.1f}")
+    assert json.loads(CODECS["json"].encode(messages[0])) == messages[0]
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
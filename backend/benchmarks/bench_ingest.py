@@ -0,0 +1,48 @@
+"""End-to-end market data throughput: synthetic source -> service -> sockets.
+
+Run from backend/: python -m benchmarks.bench_ingest [symbols] [users] [seconds]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.market_data import MarketDataService, SyntheticSource  # noqa: E402
+from app.websocket.manager import ConnectionManager  # noqa: E402
+from benchmarks.bench_broadcast import SimulatedWebSocket  # noqa: E402
+
+
+async def main(symbols: int = 500, users: int = 1000, seconds: float = 3):
+    manager = ConnectionManager()
+    # unthrottled: every subscribed symbol ticks on each pass of the generator
+    service = MarketDataService(SyntheticSource(rate=1e9, seed=1), manager)
+    await service.start()
+    sockets = []
+    for user_id in range(users):
+        websocket = SimulatedWebSocket()
+        sockets.append(websocket)
+        await manager.connect(websocket, user_id)
+        manager.subscribe_many(user_id, [f"SYM{(user_id + j) % symbols}" for j in range(20)])
+
+    await asyncio.sleep(0.5)
+    start = time.perf_counter()
+    ticks, frames = service.ticks_out.total, sum(ws.received for ws in sockets)
+    await asyncio.sleep(seconds)
+    elapsed = time.perf_counter() - start
+    ticks = service.ticks_out.total - ticks
+    frames = sum(ws.received for ws in sockets) - frames
+
+    print(f"{symbols} symbols, {users} users x 20 symbols, {seconds:g}s")
+    print(f"ticks broadcast: {ticks / elapsed:10.0f} /s")
+    print(f"frames delivered: {frames / elapsed:9.0f} /s")
+    print(service.metrics())
+    await service.stop()
+    for user_id in range(users):
+        manager.disconnect(user_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:3]), *map(float, sys.argv[3:4])))
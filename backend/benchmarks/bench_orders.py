@@ -0,0 +1,79 @@
+"""Order history: full ORM history vs one keyset page of plain rows.
+
+Seeds an in-memory SQLite database and times the query plus response
+validation. Run from backend/: python -m benchmarks.bench_orders [orders_per_user]
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi import Response  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.api.v1.endpoints.orders import list_orders  # noqa: E402
+from app.database import AsyncSessionLocal, Base, async_engine  # noqa: E402
+from app.models.order import Order, OrderSide, OrderStatus, OrderType  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.order import OrderResponse  # noqa: E402
+
+orders_adapter = TypeAdapter(list[OrderResponse])
+
+
+async def timed(fn, runs=5):
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = await fn()
+    return (time.perf_counter() - start) / runs * 1e3, result
+
+
+async def main(per_user: int = 20_000, users: int = 5):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    start = datetime(2026, 1, 1)
+    async with AsyncSessionLocal() as db:
+        db.add_all([User(id=u, username=f"u{u}", email=f"u{u}@example.com", hashed_password="x")
+                    for u in range(1, users + 1)])
+        await db.execute(insert(Order), [{
+            "user_id": u,
+            "symbol": f"SYM{i % 50}",
+            "side": OrderSide.BUY,
+            "order_type": OrderType.MARKET,
+            "quantity": 1.0,
+            "filled_quantity": 0.0,
+            "status": OrderStatus.FILLED if i % 4 else OrderStatus.PENDING,
+            "created_at": start + timedelta(seconds=i),
+        } for u in range(1, users + 1) for i in range(per_user)])
+        await db.commit()
+        user = await db.get(User, 1)
+
+    async def full_history():
+        async with AsyncSessionLocal() as db:
+            orders = await db.scalars(select(Order).where(Order.user_id == user.id).order_by(Order.created_at.desc()))
+            return orders_adapter.validate_python(orders.all(), from_attributes=True)
+
+    async def page(cursor=None):
+        async with AsyncSessionLocal() as db:
+            response = Response()
+            rows = await list_orders(response, db, user, None, None, None, None, cursor, 100)
+            return orders_adapter.validate_python(rows, from_attributes=True), response.headers.get("X-Next-Cursor")
+
+    full_ms, orders = await timed(full_history)
+    first_ms, (rows, cursor) = await timed(page)
+    deep_cursor = str(orders[per_user // 2].id)
+    deep_ms, _ = await timed(lambda: page(deep_cursor))
+
+    print(f"{users} users x {per_user} orders, in-memory SQLite")
+    print(f"{f'full history ({len(orders)} ORM orders):':38} {full_ms:8.1f} ms")
+    print(f"{f'first page of {len(rows)} rows:':38} {first_ms:8.1f} ms")
+    print(f"{'page from the middle (cursor):':38} {deep_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
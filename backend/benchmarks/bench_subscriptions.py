@@ -0,0 +1,70 @@
+"""Subscription index scaling benchmark.
+
+Run from backend/: python -m benchmarks.bench_subscriptions [subscriptions] [symbols_per_user]
+"""
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.websocket.manager import ConnectionManager  # noqa: E402
+from benchmarks.bench_broadcast import SimulatedWebSocket  # noqa: E402
+
+
+def legacy_disconnect(subscriptions, user_id):
+    """The previous behaviour: scan every symbol, never drop empty sets"""
+    for symbol in subscriptions:
+        subscriptions[symbol].discard(user_id)
+
+
+async def main(total: int = 100_000, per_user: int = 20):
+    users = total // per_user
+    universe = [f"SYM{i}" for i in range(total // 2)]
+
+    def symbols(user_id):
+        return [universe[(user_id * per_user + j) % len(universe)] for j in range(per_user)]
+
+    manager = ConnectionManager()
+    for user_id in range(users):
+        await manager.connect(SimulatedWebSocket(), user_id)
+
+    start = time.perf_counter()
+    for user_id in range(users):
+        for symbol in symbols(user_id):
+            manager.subscribe(user_id, symbol)
+    subscribe = time.perf_counter() - start
+    legacy = {symbol: set(users) for symbol, users in manager.subscriptions.items()}
+
+    start = time.perf_counter()
+    for user_id in range(0, users, 2):
+        for symbol in symbols(user_id):
+            manager.unsubscribe(user_id, symbol)
+    unsubscribe = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user_id in range(1, users, 2):
+        manager.disconnect(user_id)
+    disconnect = time.perf_counter() - start
+    for user_id in range(0, users, 2):
+        manager.disconnect(user_id)
+
+    sample = min(users, 200)
+    start = time.perf_counter()
+    for user_id in range(sample):
+        legacy_disconnect(legacy, user_id)
+    legacy_per = (time.perf_counter() - start) / sample
+
+    print(f"{total} subscriptions: {users} users x {per_user} symbols, {len(universe)} symbols")
+    print(f"subscribe:   {subscribe / total * 1e6:8.2f} us per call")
+    print(f"unsubscribe: {unsubscribe / (total / 2) * 1e6:8.2f} us per call")
+    print(f"disconnect:  {disconnect / (users / 2) * 1e6:8.2f} us per user")
+    print(f"legacy disconnect (full symbol scan): {legacy_per * 1e6:8.2f} us per user")
+    print(f"left after disconnecting everyone: {len(manager.subscriptions)} symbols, "
+          f"{len(manager.user_symbols)} users")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*map(int, sys.argv[1:])))
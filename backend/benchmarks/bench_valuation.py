@@ -0,0 +1,70 @@
+"""Portfolio valuation benchmark: vectorized engine vs a per-position loop.
+
+Run from backend/: python -m benchmarks.bench_valuation [users] [positions_per_user]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+import numpy as np  # noqa: E402
+
+from app.market_data.quotes import QuoteCache  # noqa: E402
+from app.services.valuation import PositionBook, value_book  # noqa: E402
+
+
+def loop_valuation(rows, quotes):
+    """Per-row Python valuation, as an endpoint would do position by position"""
+    totals = {}
+    for user_id, symbol, quantity, cost_basis, entry, stored, _ in rows:
+        price = quotes.last_price(symbol) or stored or entry
+        t = totals.setdefault(user_id, [0.0, 0.0, 0.0])
+        t[0] += quantity * price
+        t[1] += cost_basis
+        t[2] += quantity * price - cost_basis
+    return totals
+
+
+def main(users: int = 10_000, per_user: int = 50):
+    rng = np.random.default_rng(1)
+    symbols = [f"SYM{i}" for i in range(2000)]
+    quotes = QuoteCache(ttl=3600)
+    for symbol in symbols:
+        quotes.update(symbol, float(rng.uniform(10, 500)))
+    quotes.roll_day()
+    for symbol in symbols:
+        quotes.update(symbol, quotes.last_price(symbol) * float(rng.normal(1, 0.01)))
+
+    opened = datetime.now() - timedelta(days=3)
+    picks = rng.integers(0, len(symbols), size=users * per_user)
+    qty = rng.integers(1, 200, size=users * per_user).astype(float)
+    entry = rng.uniform(10, 500, size=users * per_user)
+    rows = [(i // per_user, symbols[s], q, q * e, e, None, opened)
+            for i, (s, q, e) in enumerate(zip(picks, qty, entry))]
+
+    start = time.perf_counter()
+    book = PositionBook.from_rows(rows)
+    build = time.perf_counter() - start
+
+    runs = 5
+    start = time.perf_counter()
+    for _ in range(runs):
+        valuation = value_book(book, quotes)
+    vectorized = (time.perf_counter() - start) / runs
+
+    start = time.perf_counter()
+    totals = loop_valuation(rows, quotes)
+    loop = time.perf_counter() - start
+
+    assert np.allclose(valuation.market_value, [totals[u][0] for u in valuation.user_id])
+    print(f"{users} users x {per_user} positions = {len(rows)} rows, {len(symbols)} symbols")
+    print(f"build arrays from rows:    {build * 1e3:8.1f} ms")
+    print(f"vectorized valuation:      {vectorized * 1e3:8.1f} ms")
+    print(f"per-position Python loop:  {loop * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
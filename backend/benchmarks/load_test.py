@@ -0,0 +1,83 @@
+"""Load test: p50/p99 latency of GET /orders and WebSocket ping under concurrency.
+
+Start the API first (e.g. uvicorn app.main:app --port 8000), then run from
+backend/: python -m benchmarks.load_test [base_url] [concurrency] [seconds]
+"""
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+import httpx
+import websockets
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000 if samples else float("nan")
+
+
+async def login(client: httpx.AsyncClient) -> tuple:
+    name = f"load{uuid.uuid4().hex[:8]}"
+    response = await client.post("/api/v1/auth/register", json={
+        "username": name, "email": f"{name}@example.com", "password": "loadtest123"
+    })
+    response.raise_for_status()
+    user_id = response.json()["id"]
+    response = await client.post("/api/v1/auth/login", data={"username": name, "password": "loadtest123"})
+    response.raise_for_status()
+    return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def hammer_orders(client, headers, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get("/api/v1/orders/", headers=headers)
+        except httpx.HTTPError:
+            errors.append(time.perf_counter() - start)
+            continue
+        if response.status_code != 200:
+            errors.append(time.perf_counter() - start)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def ping_loop(ws_url, deadline, latencies):
+    async with websockets.connect(ws_url, ping_interval=None) as ws:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"action": "ping"}))
+            await ws.recv()
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+
+async def main(base_url: str = "http://127.0.0.1:8000", concurrency: int = 50, seconds: float = 10):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        user_id, headers = await login(client)
+        for i in range(50):
+            await client.post("/api/v1/orders/buy", headers=headers,
+                              json={"symbol": f"SYM{i % 10}", "quantity": 1})
+
+        orders, errors, pings = [], [], []
+        deadline = time.perf_counter() + seconds
+        ws_url = base_url.replace("http", "ws", 1) + f"/ws/{user_id}"
+        await asyncio.gather(
+            ping_loop(ws_url, deadline, pings),
+            *[hammer_orders(client, headers, deadline, orders, errors) for _ in range(concurrency)]
+        )
+
+    print(f"{concurrency} concurrent clients for {seconds:g}s against {base_url}")
+    print(f"GET /orders  {len(orders) / seconds:7.0f} req/s  "
+          f"p50 {percentile(orders, 0.5):7.1f} ms  p99 {percentile(orders, 0.99):7.1f} ms  "
+          f"{len(errors)} errors")
+    print(f"WS ping      {len(pings):7d} pings  "
+          f"p50 {percentile(pings, 0.5):7.1f} ms  p99 {percentile(pings, 0.99):7.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(main(*args[:1], *map(int, args[1:2]), *map(float, args[2:3])))
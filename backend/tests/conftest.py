@@ -0,0 +1,67 @@
+import asyncio
+import os
+import shutil
+import tempfile
+
+import pytest
+import pytest_asyncio
+
+# Every test session gets a fresh SQLite database, so tests can use fixed
+# names and ids and a second run starts clean. Set before the app is
+# imported, since its engines are created at import time.
+TEST_DB_DIR = tempfile.mkdtemp(prefix="speedtrade-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_DB_DIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database_tables():
+    """Create the tables even when a test module never imports app.main"""
+    import app.models  # noqa: F401  registers every model
+    from app.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def finish_background_tasks():
+    """Cancel and await tasks a test left behind (e.g. WebSocket writers),
+    so they finish before the event loop is closed
+    """
+    yield
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# helpers shared by the WebSocket and market data tests
+class FakeWebSocket:
+    """Records frames; optionally slow to simulate a lagging client"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(data)
+
+    async def send_bytes(self, data: bytes):
+        await self.send_text(data)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
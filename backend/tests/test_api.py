@@ -0,0 +1,151 @@
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def auth_headers(name: str) -> dict:
+    client.post("/api/v1/auth/register", json={
+        "username": name, "email": f"{name}@example.com", "password": "secret123"
+    })
+    response = client.post("/api/v1/auth/login", data={"username": name, "password": "secret123"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_orders_flow():
+    headers = auth_headers("apiorders")
+    response = client.post("/api/v1/orders/buy", headers=headers, json={"symbol": "aapl", "quantity": 2})
+    assert response.status_code == 201
+    order = response.json()
+    assert order["symbol"] == "AAPL"
+    assert order["created_at"]
+
+    orders = client.get("/api/v1/orders/", headers=headers).json()
+    assert [o["id"] for o in orders] == [order["id"]]
+    assert client.get(f"/api/v1/orders/{order['id']}", headers=headers).status_code == 200
+    assert client.delete(f"/api/v1/orders/{order['id']}", headers=headers).status_code == 204
+    assert client.get(f"/api/v1/orders/{order['id']}", headers=headers).json()["status"] == "cancelled"
+
+
+def test_order_history_pages_with_cursor():
+    headers = auth_headers("apipages")
+    created = [
+        client.post("/api/v1/orders/buy", headers=headers, json={"symbol": f"sym{i}", "quantity": 1}).json()["id"]
+        for i in range(5)
+    ]
+    client.delete(f"/api/v1/orders/{created[0]}", headers=headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/orders/", headers=headers, params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 2
+        seen += [o["id"] for o in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == created[::-1]
+
+    pending = client.get("/api/v1/orders/", headers=headers, params={"status": "pending", "limit": 3})
+    assert [o["id"] for o in pending.json()] == created[:0:-1][:3]
+    assert pending.headers["X-Next-Cursor"] == str(created[2])
+    assert client.get("/api/v1/orders/", headers=headers, params={"status": "nope"}).status_code == 400
+    assert client.get("/api/v1/orders/", headers=headers, params={"cursor": "x"}).status_code == 400
+    assert client.get("/api/v1/orders/", headers=headers, params={"limit": 10000}).status_code == 422
+    future = client.get("/api/v1/orders/", headers=headers, params={"since": "2999-01-01T00:00:00Z"})
+    assert future.json() == []
+
+
+def test_watchlist_portfolio_and_positions_flow():
+    headers = auth_headers("apiwatch")
+    response = client.post("/api/v1/watchlist/", headers=headers, json={"name": "Tech"})
+    assert response.status_code == 201
+    watchlist = response.json()
+    assert watchlist["items"] == []
+
+    response = client.post(f"/api/v1/watchlist/{watchlist['id']}/items", headers=headers,
+                           json={"symbol": "nvda", "asset_type": "stock"})
+    assert response.status_code == 201
+    items = client.get(f"/api/v1/watchlist/{watchlist['id']}", headers=headers).json()["items"]
+    assert [i["symbol"] for i in items] == ["NVDA"]
+    assert client.get("/api/v1/watchlist/", headers=headers).json()[0]["items"][0]["symbol"] == "NVDA"
+    assert client.delete(f"/api/v1/watchlist/{watchlist['id']}", headers=headers).status_code == 204
+
+    portfolio = client.get("/api/v1/portfolio/", headers=headers).json()
+    assert portfolio["portfolio_value"] == 0.0
+    assert client.get("/api/v1/positions/", headers=headers).json() == []
+    assert client.get("/api/v1/positions/AAPL", headers=headers).status_code == 404
+
+
+def test_invalid_token():
+    response = client.get("/api/v1/orders/", headers={"Authorization": "Bearer nope"})
+    assert response.status_code == 401
+
+
+def test_authenticated_user_is_cached_until_deactivated():
+    from sqlalchemy import event
+    from app.core.auth_cache import auth_cache
+    from app.database import SessionLocal, async_engine
+    from app.models.user import User
+
+    headers = auth_headers("apicached")
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        me = client.get("/api/v1/auth/me", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+    assert me.json()["username"] == "apicached"
+    assert not [s for s in statements if "FROM users" in s]
+    assert auth_cache.get(me.json()["id"]) is not None
+
+    db = SessionLocal()
+    try:
+        db.get(User, me.json()["id"]).is_active = False
+        db.commit()
+    finally:
+        db.close()
+    assert auth_cache.get(me.json()["id"]) is None
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_auth_cache_entry_cached_before_commit_is_dropped_at_commit():
+    from sqlalchemy import update
+    from app.core.auth_cache import auth_cache
+    from app.database import SessionLocal
+    from app.models.user import User
+
+    headers = auth_headers("apicommit")
+    user_id = client.get("/api/v1/auth/me", headers=headers).json()["id"]
+
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        user.is_active = False
+        db.flush()
+        assert auth_cache.get(user_id) is None
+        # a concurrent request still reads the committed, active row
+        auth_cache.put(user, auth_cache.generation)
+        db.commit()
+        assert auth_cache.get(user_id) is None
+
+        db.execute(update(User).where(User.id == user_id).values(is_active=True))
+        db.commit()
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+        assert auth_cache.get(user_id) is not None
+        db.execute(update(User).where(User.id == user_id).values(is_active=False))
+        assert auth_cache.get(user_id) is None
+        auth_cache.put(user, auth_cache.generation)
+        db.commit()
+        assert auth_cache.get(user_id) is None
+    finally:
+        db.close()
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
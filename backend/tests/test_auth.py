@@ -1,4 +1,6 @@
+import asyncio
 import pytest
+import time
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -50,3 +52,45 @@ def test_login_user():
     # response = client.post("/api/v1/auth/login", data=login_data)
     # assert response.status_code == 200
     # assert "access_token" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_does_not_block_event_loop():
+    from app.core.hashing import PasswordHasher
+
+    hasher = PasswordHasher(rounds=10, workers=2)
+    # run inline, the hash would finish in the task's first step; on the pool the loop keeps turning
+    first = asyncio.ensure_future(hasher.hash("pw"))
+    turns = 0
+    while not first.done():
+        await asyncio.sleep(0.001)
+        turns += 1
+    assert turns > 1
+
+    hashes = await asyncio.gather(*[hasher.hash(f"pw{i}") for i in range(6)])
+    assert await hasher.verify("pw3", hashes[3])
+    assert not await hasher.verify("wrong", hashes[3])
+
+    assert hashes[0].startswith("$2b$10$")
+    metrics = hasher.metrics()
+    assert metrics["completed"] == 9
+    assert metrics["pending"] == 0
+    assert metrics["peak_pending"] == 6
+
+
+def test_cached_token_still_expires():
+    from jose import JWTError
+    from app.api.v1.endpoints.auth import create_access_token
+    from app.core.auth_cache import AuthCache
+
+    now = [time.time()]
+    cache = AuthCache(clock=lambda: now[0], max_entries=2)
+    token = create_access_token({"sub": "7"})
+    assert cache.user_id(token) == 7
+    assert cache.user_id(token) == 7
+    assert (cache.token_hits, cache.token_misses) == (1, 1)
+
+    now[0] += 31 * 60
+    with pytest.raises(JWTError):
+        cache.user_id(token)
+    assert not cache.tokens
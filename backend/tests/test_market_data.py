@@ -0,0 +1,198 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.market_data import MarketDataService, ReplaySource, SyntheticSource, Tick
+from app.websocket.manager import ConnectionManager
+from tests.conftest import FakeWebSocket, drain
+
+
+def test_tick_payload():
+    tick = Tick("AAPL", 190.5, bid=190.49, ask=190.51, volume=10, timestamp=1704209400.25)
+    assert tick.as_dict() == {
+        "symbol": "AAPL", "price": 190.5, "bid": 190.49, "ask": 190.51,
+        "volume": 10, "timestamp": 1704209400250,
+    }
+
+
+@pytest.mark.asyncio
+async def test_upstream_follows_subscribers():
+    manager = ConnectionManager()
+    source = SyntheticSource(rate=200, seed=1)
+    service = MarketDataService(source, manager)
+    await service.start()
+    ws = FakeWebSocket()
+    await manager.connect(ws, 1)
+    await asyncio.sleep(0.02)
+    assert source.symbols == set()
+
+    manager.subscribe(1, "AAPL")
+    await asyncio.sleep(0.05)
+    assert source.symbols == {"AAPL"}
+    assert ws.frames and service.ticks_out.total == len(ws.frames)
+    assert service.metrics()["symbols"] == 1
+
+    manager.disconnect(1)
+    await drain()
+    assert source.symbols == set()
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_one_worker_ingests_for_all_workers():
+    from app.market_data import MarketDataLeader, MarketDataSource
+    from app.websocket.backplane import InMemoryBackplane
+
+    hub, leases = {}, {}
+    workers = [ConnectionManager(), ConnectionManager()]
+    leaders = []
+    for worker in workers:
+        backplane = InMemoryBackplane(hub, leases)
+        await worker.start(backplane)
+        leaders.append(MarketDataLeader(MarketDataService(MarketDataSource(), worker), backplane))
+        await leaders[-1].elect()
+    assert [leader.leading for leader in leaders] == [True, False]
+
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await workers[0].connect(a, 1, conflation_ms=0)
+    await workers[1].connect(b, 2, conflation_ms=0)
+    workers[0].subscribe(1, "AAPL")
+    workers[1].subscribe(2, "AAPL")
+    workers[1].subscribe(2, "MSFT")
+    await drain()
+    # the leader streams the symbols wanted on either worker; the other one ingests nothing
+    source = leaders[0].service.source
+    assert source.symbols == {"AAPL", "MSFT"}
+    assert leaders[1].service.source.symbols == set()
+    assert leaders[1].service.source._emit is None
+
+    for symbol, price in [("AAPL", 1.0), ("MSFT", 2.0), ("AAPL", 1.5)]:
+        source._emit(Tick.now(symbol, price))
+    await drain()
+    received = lambda ws: [(m["data"]["symbol"], m["data"]["price"]) for m in map(json.loads, ws.frames)]
+    assert received(a) == [("AAPL", 1.0), ("AAPL", 1.5)]
+    assert received(b) == [("AAPL", 1.0), ("MSFT", 2.0), ("AAPL", 1.5)]
+
+    # the other worker takes over when the leader goes away
+    await leaders[0].stop()
+    await leaders[1].elect()
+    await drain()
+    assert leaders[1].leading
+    assert leaders[1].service.source.symbols == {"AAPL", "MSFT"}
+    await leaders[1].stop()
+    for worker, user_id in zip(workers, (1, 2)):
+        worker.disconnect(user_id)
+        await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_replay_source_streams_subscribed_symbols(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text(
+        "symbol,price,bid,ask,volume,timestamp\n"
+        "AAPL,190.1,190.0,190.2,100,2024-01-02T15:30:00Z\n"
+        "MSFT,370.5,,,,2024-01-02T15:30:00Z\n"
+        "AAPL,190.3,190.2,190.4,50,2024-01-02T15:30:01Z\n"
+    )
+    source = ReplaySource(str(path), speed=0)
+    ticks = []
+    await source.subscribe(["AAPL"])
+    await source.start(ticks.append)
+    await asyncio.sleep(0.01)
+    assert [(t.symbol, t.price, t.volume) for t in ticks] == [("AAPL", 190.1, 100.0), ("AAPL", 190.3, 50.0)]
+    await source.stop()
+
+
+@pytest.mark.asyncio
+async def test_looping_replay_yields_and_idles(tmp_path):
+    path = tmp_path / "ticks.csv"
+    path.write_text("symbol,price,timestamp\nAAPL,190.1,100\nAAPL,190.2,100\n")
+    ticks = []
+    source = ReplaySource(str(path), speed=0, loop=True)
+    await source.start(ticks.append)
+    await asyncio.sleep(0.01)
+    assert ticks == []  # nobody subscribed: the file is not read
+    await source.subscribe(["AAPL"])
+    await asyncio.sleep(0.01)  # only returns if the replay yields to the loop
+    assert len(ticks) > 2
+    await source.stop()
+
+    ticks.clear()
+    paced = ReplaySource(str(path), speed=1, loop=True)
+    await paced.subscribe(["AAPL"])
+    await paced.start(ticks.append)
+    await asyncio.sleep(0.05)
+    assert len(ticks) == 2  # one pass without gaps, then a one second pause
+    await paced.stop()
+
+
+def test_metrics_endpoint():
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.json()["websocket"]["connections"] == 0
+    assert response.json()["market_data"] is None
+
+
+def test_quote_cache_ttl():
+    from app.market_data.quotes import QuoteCache
+    now = [1000.0]
+    cache = QuoteCache(ttl=5, clock=lambda: now[0])
+    cache.update("AAPL", 190.0, bid=189.9)
+    cache.update("MSFT", 370.0)
+    cache.update("AAPL", 191.0, bid=190.9, ask=191.1)
+    assert len(cache) == 2
+    quote = cache.get("AAPL")
+    assert (quote.price, quote.bid, quote.ask) == (191.0, 190.9, 191.1)
+    assert cache.get("MSFT").bid is None
+    assert cache.get("TSLA") is None
+
+    now[0] += 6
+    assert cache.get("AAPL") is None
+    assert cache.last_price("MSFT") is None
+    assert cache.snapshot(["AAPL", "MSFT"]) == {}
+
+
+def test_quote_cache_stays_consistent_while_read_elsewhere():
+    import numpy as np
+    from app.market_data.quotes import QuoteCache
+    cache = QuoteCache(ttl=60)
+    cache.update("AAPL", 190.0)
+    copy = cache.copy()
+
+    view = np.frombuffer(cache.updated)  # e.g. valuation reading the live columns
+    with pytest.raises(BufferError):
+        cache.update("MSFT", 370.0)
+    del view
+    assert "MSFT" not in cache.slots
+    assert {len(column) for column in cache._columns()} == {1}
+    cache.update("MSFT", 370.0)
+    cache.update("AAPL", 191.0)
+    assert (cache.last_price("AAPL"), cache.last_price("MSFT")) == (191.0, 370.0)
+    # the copy is untouched
+    assert (copy.last_price("AAPL"), copy.last_price("MSFT")) == (190.0, None)
+
+
+def test_position_valued_from_quote_cache():
+    from datetime import datetime
+    from app.api.v1.endpoints.positions import value_position
+    from app.market_data.quotes import quote_cache
+    from app.models.position import Position
+
+    position = Position(
+        id=1, user_id=1, symbol="QCTEST", quantity=10, average_entry_price=100.0,
+        current_price=100.0, market_value=1000.0, cost_basis=1000.0,
+        unrealized_pl=0.0, unrealized_pl_percent=0.0, asset_type="stock",
+        created_at=datetime(2024, 1, 2)
+    )
+    assert value_position(position).current_price == 100.0
+
+    quote_cache.update("QCTEST", 110.0)
+    valued = value_position(position)
+    assert valued.current_price == 110.0
+    assert valued.market_value == 1100.0
+    assert valued.unrealized_pl == 100.0
+    assert valued.unrealized_pl_percent == 10.0
+    assert valued.price_updated_at is not None
+    # the ORM object is left untouched
+    assert position.current_price == 100.0
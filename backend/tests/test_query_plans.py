@@ -0,0 +1,118 @@
+"""The hot per-user queries must search an index, not scan their table.
+
+Runs SQLite's EXPLAIN QUERY PLAN on a seeded, ANALYZEd database built from
+the models, so a dropped index or a query the indexes no longer fit fails
+here. PostgreSQL plans differ in detail but need the same indexes.
+"""
+from datetime import datetime, timedelta
+import re
+
+import pytest
+from sqlalchemy import create_engine, insert, select, tuple_
+from sqlalchemy.orm import aliased
+
+from app.database import Base
+from app.models import Order, Portfolio, Position, User, Watchlist, WatchlistItem
+from app.models.order import OrderSide, OrderStatus, OrderType
+from app.services.valuation import book_query
+
+USERS = 200
+SYMBOLS = [f"SYM{i}" for i in range(40)]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u, "username": f"u{u}", "email": f"u{u}@example.com", "hashed_password": "x"}
+            for u in range(1, USERS + 1)
+        ])
+        conn.execute(insert(Portfolio), [{"user_id": u} for u in range(1, USERS + 1)])
+        conn.execute(insert(Order), [{
+            "user_id": u,
+            "symbol": SYMBOLS[i % len(SYMBOLS)],
+            "side": OrderSide.BUY,
+            "order_type": OrderType.MARKET,
+            "quantity": 1.0,
+            "status": OrderStatus.FILLED if i % 5 else OrderStatus.PENDING,
+            "created_at": start + timedelta(minutes=i),
+        } for u in range(1, USERS + 1) for i in range(50)])
+        conn.execute(insert(Position), [{
+            "user_id": u,
+            "symbol": symbol,
+            "quantity": 0.0 if i % 3 == 0 else 10.0,
+            "average_entry_price": 100.0,
+            "cost_basis": 1000.0,
+        } for u in range(1, USERS + 1) for i, symbol in enumerate(SYMBOLS[:15])])
+        conn.execute(insert(Watchlist), [
+            {"id": u * 3 + w, "user_id": u, "name": f"list {w}"} for u in range(1, USERS + 1) for w in range(3)
+        ])
+        conn.execute(insert(WatchlistItem), [
+            {"watchlist_id": u * 3 + w, "symbol": symbol, "asset_type": "stock"}
+            for u in range(1, USERS + 1) for w in range(3) for symbol in SYMBOLS[:10]
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    with engine.connect() as conn:
+        yield conn
+
+
+def query_plan(conn, statement) -> list:
+    sql = statement.compile(conn.engine, compile_kwargs={"literal_binds": True})
+    return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def assert_index_search(plan: list, table: str, index: str, ordered: bool = False):
+    """``table`` is searched through ``index``, never fully scanned"""
+    uses = rf"^SEARCH {table} USING (COVERING )?INDEX {index} \("
+    assert any(re.match(uses, step) for step in plan), plan
+    assert not any(re.match(rf"^SCAN {table}\b", step) for step in plan), plan
+    if ordered:
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_order_history_pages_use_the_user_index(conn):
+    history = (
+        select(Order.id, Order.symbol, Order.status)
+        .where(Order.user_id == 7)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(101)
+    )
+    assert_index_search(query_plan(conn, history), "orders", "ix_orders_user_id_created_at", ordered=True)
+
+    last = aliased(Order)
+    page = history.where(tuple_(Order.created_at, Order.id) < select(last.created_at, last.id).where(
+        last.id == 350, last.user_id == 7
+    ).scalar_subquery())
+    assert_index_search(query_plan(conn, page), "orders", "ix_orders_user_id_created_at", ordered=True)
+
+
+def test_order_history_by_status_uses_the_status_index(conn):
+    query = (
+        select(Order.id)
+        .where(Order.user_id == 7, Order.status == OrderStatus.PENDING)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(101)
+    )
+    assert_index_search(query_plan(conn, query), "orders", "ix_orders_user_id_status_created_at", ordered=True)
+
+
+def test_position_queries_use_user_indexes(conn):
+    active = select(Position).where(Position.user_id == 7, Position.quantity > 0)
+    assert_index_search(query_plan(conn, active), "positions", "ix_positions_user_id_active")
+
+    one = select(Position).where(Position.user_id == 7, Position.symbol == "SYM3")
+    assert_index_search(query_plan(conn, one), "positions", "uq_positions_user_id_symbol")
+
+    assert_index_search(query_plan(conn, book_query(7)), "positions", "uq_positions_user_id_symbol")
+
+
+def test_watchlist_queries_use_user_indexes(conn):
+    watchlists = select(Watchlist).where(Watchlist.user_id == 7)
+    assert_index_search(query_plan(conn, watchlists), "watchlists", "ix_watchlists_user_id")
+
+    # selectinload of Watchlist.items
+    items = select(WatchlistItem).where(WatchlistItem.watchlist_id.in_([21, 22, 23]))
+    assert_index_search(query_plan(conn, items), "watchlist_items", "sqlite_autoindex_watchlist_items_1")
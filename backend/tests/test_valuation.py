@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.market_data.quotes import QuoteCache
+from app.services.valuation import PositionBook, portfolio_values, value_book
+
+# UTC, like the opened-today check under test
+YESTERDAY = datetime.now(timezone.utc) - timedelta(days=1)
+
+
+def make_quotes():
+    quotes = QuoteCache(ttl=60)
+    quotes.update("AAPL", 100.0)
+    quotes.update("TSLA", 200.0)
+    quotes.roll_day()
+    quotes.update("AAPL", 110.0)
+    quotes.update("TSLA", 190.0)
+    return quotes
+
+
+def test_value_book_totals_per_user():
+    book = PositionBook.from_rows([
+        # user, symbol, quantity, cost basis, entry, stored price, opened
+        (1, "AAPL", 10, 900.0, 90.0, 95.0, YESTERDAY),
+        (1, "TSLA", -5, -1000.0, 200.0, None, YESTERDAY),
+        (2, "AAPL", 2, 210.0, 105.0, None, datetime.now(timezone.utc)),
+        (2, "MSFT", 1, 300.0, 300.0, 310.0, YESTERDAY),
+    ])
+    valuation = value_book(book, make_quotes())
+
+    first = valuation.for_user(1)
+    assert first["long_market_value"] == 1100.0
+    assert first["short_market_value"] == -950.0
+    assert first["market_value"] == 150.0
+    assert first["gross_exposure"] == 2050.0
+    assert first["unrealized_pl"] == pytest.approx(150.0 - (900.0 - 1000.0))
+    # day P&L against the previous close: +10 * 10 and -5 * -10
+    assert first["day_pl"] == 150.0
+
+    second = valuation.for_user(2)
+    # opened today: measured from entry; MSFT has no quote, so stored price and no day move
+    assert second["market_value"] == 2 * 110.0 + 310.0
+    assert second["day_pl"] == 2 * (110.0 - 105.0)
+    assert valuation.for_user(3)["market_value"] == 0.0
+
+
+def test_day_pl_of_position_held_across_days_without_a_roll():
+    quotes = QuoteCache(ttl=60)
+    quotes.update("AAPL", 110.0)  # e.g. restarted since the last close: no previous close
+    book = PositionBook.from_rows([
+        (1, "AAPL", 10, 900.0, 90.0, None, YESTERDAY),
+        (2, "AAPL", 10, 900.0, 90.0, 105.0, YESTERDAY),  # marked at 105 by the last snapshot
+    ])
+    valuation = value_book(book, quotes)
+    unmarked = valuation.for_user(1)
+    assert unmarked["unrealized_pl"] == 200.0
+    assert unmarked["day_pl"] == 0.0
+    assert valuation.for_user(2)["day_pl"] == 10 * (110.0 - 105.0)
+
+
+def test_portfolio_values():
+    values = portfolio_values(1000.0, {
+        "market_value": 500.0, "long_market_value": 500.0, "short_market_value": 0.0,
+        "cost_basis": 400.0, "unrealized_pl": 100.0, "day_pl": 50.0,
+    })
+    assert values["portfolio_value"] == 1500.0
+    assert values["total_pl_percent"] == 25.0
+    assert values["day_pl_percent"] == pytest.approx(50.0 / 1450.0 * 100)
+
+
+def test_snapshot_portfolios_batch():
+    from app.database import SessionLocal
+    from app.models.portfolio import Portfolio
+    from app.models.position import Position
+    from app.services.valuation import snapshot_portfolios
+
+    db = SessionLocal()
+    db.add_all([
+        Portfolio(user_id=901, cash_balance=1000.0),
+        Portfolio(user_id=902, cash_balance=50.0),
+        Position(user_id=901, symbol="AAPL", quantity=10, average_entry_price=90.0,
+                 cost_basis=900.0, asset_type="stock"),
+    ])
+    db.commit()
+    assert snapshot_portfolios(db, make_quotes()) >= 2
+    values = dict(db.query(Portfolio.user_id, Portfolio.portfolio_value).filter(Portfolio.user_id.in_([901, 902])))
+    assert values == {901: 2100.0, 902: 50.0}
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_end_of_day_snapshots_then_rolls():
+    from datetime import time
+    from app.database import SessionLocal
+    from app.models.portfolio import Portfolio
+    from app.models.position import Position
+    from app.services.valuation import EndOfDay
+
+    db = SessionLocal()
+    db.add_all([
+        Portfolio(user_id=903, cash_balance=0.0),
+        Position(user_id=903, symbol="EODX", quantity=10, average_entry_price=90.0,
+                 cost_basis=900.0, asset_type="stock", created_at=YESTERDAY),
+    ])
+    db.commit()
+    quotes = QuoteCache(ttl=60)
+    quotes.update("EODX", 100.0)
+    quotes.roll_day()
+    quotes.update("EODX", 110.0)
+
+    end_of_day = EndOfDay(time(21, 0), SessionLocal, quotes)
+    await end_of_day.run()
+    portfolio = db.query(Portfolio).filter_by(user_id=903).one()
+    position = db.query(Position).filter_by(user_id=903).one()
+    assert portfolio.day_pl == 100.0
+    assert (position.current_price, position.market_value, position.unrealized_pl) == (110.0, 1100.0, 200.0)
+    assert end_of_day.metrics()["portfolios"] >= 1
+
+    # the next day moves from the close
+    quotes.update("EODX", 112.0)
+    book = PositionBook.from_rows([(903, "EODX", 10, 900.0, 90.0, 110.0, YESTERDAY)])
+    assert value_book(book, quotes).for_user(903)["day_pl"] == 20.0
+    db.close()
+
+    utc = timezone.utc
+    assert end_of_day.seconds_until_next(datetime(2026, 1, 5, 20, 0, tzinfo=utc)) == 3600
+    assert end_of_day.seconds_until_next(datetime(2026, 1, 5, 21, 0, tzinfo=utc)) == 24 * 3600
+
+
+@pytest.mark.asyncio
+async def test_end_of_day_snapshot_written_by_lease_holder_only():
+    from datetime import time
+    from app.database import SessionLocal
+    from app.services.valuation import EndOfDay
+    from app.websocket.backplane import InMemoryBackplane
+
+    leases = {}
+    workers = [EndOfDay(time(21, 0), SessionLocal, make_quotes(), InMemoryBackplane(leases=leases))
+               for _ in range(2)]
+    await workers[0].start()
+    for end_of_day in workers:
+        await end_of_day.run()
+        # every worker rolls its own cache
+        assert end_of_day.quotes.prev_close.tolist() == [110.0, 190.0]
+    assert workers[0].last_snapshot is not None
+    assert workers[1].last_snapshot is None and workers[1].last_run is not None
+    await workers[0].stop()
+    assert workers[0]._task.cancelled()
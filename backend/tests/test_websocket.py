@@ -0,0 +1,381 @@
+import asyncio
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.websocket.manager import ConnectionManager
+from tests.conftest import FakeWebSocket, drain
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_and_fans_out():
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for user_id, ws in enumerate(sockets):
+        await manager.connect(ws, user_id)
+        manager.subscribe(user_id, "AAPL")
+
+    await manager.broadcast_price_update("AAPL", {"symbol": "AAPL", "price": 1.5})
+    await drain()
+
+    frames = [ws.frames[0] for ws in sockets]
+    assert json.loads(frames[0]) == {"event": "price_update", "data": {"symbol": "AAPL", "price": 1.5}}
+    assert all(frame is frames[0] for frame in frames)
+    for user_id in range(len(sockets)):
+        manager.disconnect(user_id)
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_stall_others():
+    manager = ConnectionManager()
+    slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+    slow_conn = await manager.connect(slow, 1)
+    await manager.connect(fast, 2)
+    slow_conn.max_queue = 4
+    manager.subscribe(1, "MSFT")
+    manager.subscribe(2, "MSFT")
+
+    for i in range(10):
+        await asyncio.wait_for(manager.broadcast_price_update("MSFT", {"price": i}), 0.1)
+    await drain()
+
+    assert len(fast.frames) == 10
+    assert slow_conn.dropped > 0
+    assert [json.loads(f)["data"]["price"] for f, _ in slow_conn.queue] == [6, 7, 8, 9]
+    manager.disconnect(1)
+    manager.disconnect(2)
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_prices_not_order_updates():
+    manager = ConnectionManager()
+    slow = FakeWebSocket(delay=10)
+    connection = await manager.connect(slow, 1)
+    connection.max_queue = 4
+    connection.max_dropped = 5
+    manager.subscribe(1, "MSFT")
+    await drain()
+
+    await manager.broadcast_order_update(1, {"id": 1})
+    for i in range(6):
+        await manager.broadcast_price_update("MSFT", {"price": i})
+    events = [json.loads(f)["data"] for f, _ in connection.queue]
+    assert events == [{"id": 1}, {"price": 3}, {"price": 4}, {"price": 5}]
+
+    # past max_dropped the client is closed with "try again later"
+    for i in range(6, 12):
+        await manager.broadcast_price_update("MSFT", {"price": i})
+    await drain()
+    assert connection.closed
+    assert slow.close_code == 1013
+    assert 1 not in manager.active_connections
+    assert manager.subscriptions == {} and manager.user_symbols == {}
+
+    # a late subscribe from the receive loop is cleaned up by its final disconnect
+    manager.subscribe(1, "MSFT")
+    manager.disconnect(1, connection)
+    assert manager.subscriptions == {} and manager.user_symbols == {}
+
+
+def test_websocket_closed_by_server_ends_receive_loop():
+    from app.websocket.manager import manager
+
+    client = TestClient(app)
+    with client.websocket_connect("/ws/14") as websocket:
+        websocket.send_text(json.dumps({"action": "ping"}))
+        assert websocket.receive_json() == {"event": "pong"}
+        (connection,) = manager.active_connections[14]
+
+        async def drop():
+            connection.close(code=1013)
+
+        websocket.portal.call(drop)  # on the app's event loop
+        assert websocket.receive() == {"type": "websocket.close", "code": 1013, "reason": ""}
+        websocket.send_text(json.dumps({"action": "subscribe", "symbol": "AAPL"}))
+    assert 14 not in manager.user_symbols
+    assert 14 not in manager.subscriptions.get("AAPL", ())
+
+
+@pytest.mark.asyncio
+async def test_failing_socket_is_disconnected():
+    class BrokenWebSocket(FakeWebSocket):
+        async def send_text(self, data):
+            raise RuntimeError("gone")
+
+    manager = ConnectionManager()
+    await manager.connect(BrokenWebSocket(), 7)
+    manager.subscribe(7, "TSLA")
+    await manager.broadcast_price_update("TSLA", {"price": 1})
+    await drain()
+    assert 7 not in manager.active_connections
+
+
+def test_websocket_ping_pong():
+    client = TestClient(app)
+    with client.websocket_connect("/ws/1") as websocket:
+        websocket.send_text(json.dumps({"action": "ping"}))
+        assert websocket.receive_json() == {"event": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_conflation_keeps_latest_price_per_symbol():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    connection = await manager.connect(ws, 1, conflation_ms=50)
+    manager.subscribe(1, "AAPL")
+    manager.subscribe(1, "MSFT")
+
+    for i in range(100):
+        await manager.broadcast_price_update("AAPL", {"price": i})
+        await manager.broadcast_price_update("MSFT", {"price": -i})
+    await drain()
+    first = [json.loads(f)["data"]["price"] for f in ws.frames]
+    assert first == [99, -99]
+
+    # updates during the flush interval are held back, then only the latest is sent
+    for i in range(100, 110):
+        await manager.broadcast_price_update("AAPL", {"price": i})
+    await drain()
+    assert len(ws.frames) == 2
+    await asyncio.sleep(0.08)
+    assert json.loads(ws.frames[-1])["data"]["price"] == 109
+    assert len(ws.frames) == 3
+    assert connection.conflated == 99 * 2 + 9
+    manager.disconnect(1)
+
+
+@pytest.mark.asyncio
+async def test_conflation_does_not_delay_other_frames():
+    manager = ConnectionManager()
+    ws = FakeWebSocket()
+    await manager.connect(ws, 1, conflation_ms=1000)
+    manager.subscribe(1, "AAPL")
+    await manager.broadcast_price_update("AAPL", {"price": 1})
+    await drain()
+    await manager.broadcast_price_update("AAPL", {"price": 2})
+    await manager.broadcast_order_update(1, {"id": 9})
+    await drain()
+    # the order update goes out at once; the second price waits for the next flush
+    assert [json.loads(f)["event"] for f in ws.frames] == ["price_update", "order_update"]
+    manager.disconnect(1)
+
+
+def test_websocket_conflation_query_param():
+    client = TestClient(app)
+    with client.websocket_connect("/ws/5?conflate_ms=250") as websocket:
+        from app.websocket.manager import manager
+        (connection,) = manager.active_connections[5]
+        assert connection.conflation_interval == 0.25
+        websocket.send_text(json.dumps({"action": "ping"}))
+        assert websocket.receive_json() == {"event": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cleans_both_indexes():
+    manager = ConnectionManager()
+    await manager.connect(FakeWebSocket(), 1)
+    await manager.connect(FakeWebSocket(), 2)
+    for symbol in ("AAPL", "MSFT"):
+        manager.subscribe(1, symbol)
+    manager.subscribe(2, "AAPL")
+
+    manager.unsubscribe(1, "MSFT")
+    assert "MSFT" not in manager.subscriptions
+    assert manager.user_symbols[1] == {"AAPL"}
+
+    manager.disconnect(1)
+    assert manager.subscriptions == {"AAPL": {2}}
+    assert 1 not in manager.user_symbols
+    manager.disconnect(2)
+    assert manager.subscriptions == {}
+    assert manager.user_symbols == {}
+    assert manager.active_connections == {}
+
+
+@pytest.mark.asyncio
+async def test_multiple_connections_per_user():
+    manager = ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    conn1 = await manager.connect(first, 1)
+    await manager.connect(second, 1)
+    manager.subscribe(1, "AAPL")
+
+    await manager.broadcast_price_update("AAPL", {"price": 1})
+    await manager.broadcast_order_update(1, {"id": 3})
+    await drain()
+    assert len(first.frames) == len(second.frames) == 2
+
+    # closing one tab keeps the other one and the subscriptions
+    manager.disconnect(1, conn1)
+    assert len(manager.active_connections[1]) == 1
+    await manager.broadcast_price_update("AAPL", {"price": 2})
+    await drain()
+    assert len(first.frames) == 2
+    assert len(second.frames) == 3
+
+    manager.disconnect(1)
+    assert manager.subscriptions == {}
+
+
+def test_batch_subscribe_acks_once_with_snapshot():
+    from app.websocket.manager import manager
+    manager.quotes.update("AAPL", 190.1)
+    client = TestClient(app)
+    with client.websocket_connect("/ws/11") as websocket:
+        websocket.send_text(json.dumps({"action": "subscribe", "symbols": ["AAPL", "MSFT", "AAPL"]}))
+        ack = websocket.receive_json()
+        assert ack["event"] == "subscribed"
+        assert ack["symbols"] == ["AAPL", "MSFT"]
+        assert list(ack["snapshot"]) == ["AAPL"]
+        assert ack["snapshot"]["AAPL"]["price"] == 190.1
+        assert manager.user_symbols[11] == {"AAPL", "MSFT"}
+
+        websocket.send_text(json.dumps({"action": "unsubscribe", "symbols": ["AAPL", "MSFT"]}))
+        assert websocket.receive_json() == {"event": "unsubscribed", "symbols": ["AAPL", "MSFT"]}
+        assert 11 not in manager.user_symbols
+
+
+def test_subscribe_watchlist():
+    from app.database import SessionLocal
+    from app.models.user import User
+    from app.models.watchlist import Watchlist, WatchlistItem
+    from app.websocket.manager import manager
+
+    db = SessionLocal()
+    name = f"wswatch{uuid.uuid4().hex[:8]}"
+    user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+    watchlist = Watchlist(name="Tech")
+    watchlist.items = [WatchlistItem(symbol=s, asset_type="stock") for s in ("NVDA", "AMD")]
+    db.add(user)
+    db.flush()
+    watchlist.user_id = user_id = user.id
+    db.add(watchlist)
+    db.commit()
+    watchlist_id = watchlist.id
+    db.close()
+
+    client = TestClient(app)
+    with client.websocket_connect(f"/ws/{user_id}") as websocket:
+        websocket.send_text(json.dumps({"action": "subscribe_watchlist", "watchlist_id": watchlist_id}))
+        ack = websocket.receive_json()
+        assert ack["event"] == "subscribed"
+        assert ack["watchlist_id"] == watchlist_id
+        assert sorted(ack["symbols"]) == ["AMD", "NVDA"]
+        assert manager.user_symbols[user_id] == {"AMD", "NVDA"}
+
+        # unknown or foreign watchlists are rejected
+        websocket.send_text(json.dumps({"action": "subscribe_watchlist", "watchlist_id": watchlist_id + 1000}))
+        assert websocket.receive_json()["event"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_once_per_codec():
+    import msgpack
+    from app.websocket.encoding import get_codec
+
+    manager = ConnectionManager()
+    text, binary = FakeWebSocket(), FakeWebSocket()
+    await manager.connect(text, 1)
+    await manager.connect(binary, 2, codec=get_codec("msgpack"))
+    for user_id in (1, 2):
+        manager.subscribe(user_id, "AAPL")
+
+    data = {"symbol": "AAPL", "price": 1.5}
+    await manager.broadcast_price_update("AAPL", data)
+    await drain()
+    assert json.loads(text.frames[0]) == {"event": "price_update", "data": data}
+    assert isinstance(binary.frames[0], bytes)
+    assert msgpack.unpackb(binary.frames[0]) == {"event": "price_update", "data": data}
+    assert get_codec("unknown").name == "json"
+    manager.disconnect(1)
+    manager.disconnect(2)
+
+
+def test_websocket_msgpack_encoding():
+    import msgpack
+    client = TestClient(app)
+    with client.websocket_connect("/ws/13?encoding=msgpack") as websocket:
+        websocket.send_text(json.dumps({"action": "ping"}))
+        assert msgpack.unpackb(websocket.receive_bytes()) == {"event": "pong"}
+
+
+@pytest.mark.asyncio
+async def test_backplane_fans_out_across_workers():
+    from app.websocket.backplane import InMemoryBackplane
+
+    hub = {}
+    workers = [ConnectionManager(), ConnectionManager()]
+    for worker in workers:
+        await worker.start(InMemoryBackplane(hub))
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await workers[0].connect(a, 1)
+    await workers[1].connect(b, 2)
+    workers[0].subscribe(1, "AAPL")
+    workers[1].subscribe(2, "AAPL")
+    workers[1].subscribe(2, "MSFT")
+    await drain()  # symbol announcements
+    published = workers[0].backplane.published
+    # every worker gets all prices, but only the users it has connections for
+    assert workers[0].backplane.channels == {"user:1", "prices", "symbols"}
+
+    await workers[0].broadcast_price_update("AAPL", {"price": 1})
+    await workers[0].broadcast_price_update("MSFT", {"price": 2})
+    await workers[0].broadcast_order_update(2, {"id": 9})
+    await drain()
+    assert [json.loads(f)["data"] for f in a.frames] == [{"price": 1}]
+    assert [json.loads(f)["data"] for f in b.frames] == [{"price": 1}, {"price": 2}, {"id": 9}]
+    assert workers[0].backplane.published == published + 3
+    # both quote caches are complete, whichever worker has subscribers
+    for worker in workers:
+        assert worker.quotes.last_price("AAPL") == 1
+        assert worker.quotes.last_price("MSFT") == 2
+
+    workers[1].disconnect(2)
+    assert workers[1].backplane.channels == {"prices", "symbols"}
+    everyone = {w.backplane for w in workers}
+    assert hub == {"user:1": {workers[0].backplane}, "prices": everyone, "symbols": everyone}
+    for worker in workers:
+        worker.disconnect(1)
+        await worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_redis_backplane_applies_channel_changes_made_while_subscribing():
+    from app.websocket.backplane import RedisBackplane
+
+    class PubSub:
+        def __init__(self):
+            self.channels = set()
+            self.fail = False
+
+        async def subscribe(self, *channels):
+            await asyncio.sleep(0)
+            if self.fail:
+                raise ConnectionError("redis down")
+            self.channels.update(channels)
+
+        async def unsubscribe(self, *channels):
+            await asyncio.sleep(0)
+            self.channels.difference_update(channels)
+
+    backplane = RedisBackplane("redis://unused")
+    backplane.pubsub = PubSub()
+    backplane.subscribe("price:AAPL")
+    applying = asyncio.create_task(backplane._apply_changes())
+    await asyncio.sleep(0)
+    backplane.subscribe("price:MSFT")
+    await applying
+    assert backplane.pubsub.channels == {"price:AAPL"}
+    assert backplane._changed.is_set()
+    await backplane._apply_changes()
+    assert backplane.pubsub.channels == {"price:AAPL", "price:MSFT"}
+
+    backplane.pubsub.fail = True
+    backplane.subscribe("price:TSLA")
+    with pytest.raises(ConnectionError):
+        await backplane._apply_changes()
+    assert backplane._changed.is_set()
+    backplane.pubsub.fail = False
+    await backplane._apply_changes()
+    assert "price:TSLA" in backplane.pubsub.channels
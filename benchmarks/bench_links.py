@@ -0,0 +1,31 @@
+"""Time URL classification over every README link:
+python benchmarks/bench_links.py [README.md]"""
+import os
+import re
+import sys
+import timeit
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from links import classify  # noqa: E402
+
+
+def main(path='README.md'):
+    with open(path, encoding='utf8') as f:
+        urls = re.findall(r'\]\((https?://[^)\s]+)\)', f.read())
+    runs = 100
+
+    def cold():
+        classify.cache_clear()
+        for u in urls:
+            classify(u)
+    best = min(timeit.repeat(cold, number=runs, repeat=5)) / runs
+    warm = min(timeit.repeat(lambda: [classify(u) for u in urls], number=runs, repeat=5)) / runs
+    print(f'{len(urls)} links: {best * 1e3:.3f} ms cold '
+          f'({best / len(urls) * 1e6:.2f} us/link), {warm * 1e3:.3f} ms cached')
+    print(dict(Counter(classify(u).host or 'other' for u in urls)))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,21 @@
+"""Time the README parser: python benchmarks/bench_readme.py [README.md]"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from readme import iter_entries  # noqa: E402
+
+
+def main(path='README.md'):
+    with open(path, encoding='utf8') as f:
+        lines = f.readlines()
+    n = len(list(iter_entries(lines)))
+    runs = 200
+    best = min(timeit.repeat(lambda: list(iter_entries(lines)), number=runs, repeat=5))
+    print(f'{len(lines)} lines, {n} entries: {best / runs * 1e3:.3f} ms per parse')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -1,76 +1,81 @@
+import argparse
+import csv
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-import re
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-reu = re.compile(r'https://github.com/([\w-]+/[\w-]+)')
+from httpcache import HTTPCache
+from links import classify
+
+reu = re.compile(r'https://github\.com/[\w-]+/[\w.-]+')
 red = re.compile(r'\d\d\d\d-\d\d-\d\d')
+rec = re.compile(r'https?://(?:www\.)?cran\.r-project\.org/[^\s)\]>"]+', re.IGNORECASE)
+
+
+def normalize(url):
+    """Canonical index page of the CRAN package ``url`` points to, or ''."""
+    link = classify(url)
+    return link.url if link.host == 'cran' else ''
+
+
+def discover(path='README.md'):
+    """CRAN package URLs linked from ``path``, normalized and de-duplicated."""
+    with open(path, 'r', encoding='utf8') as f:
+        urls = (normalize(u) for u in rec.findall(f.read()))
+        return list(dict.fromkeys(u for u in urls if u))
+
 
-url = 'https://cran.r-project.org/web/packages/xts/index.html'
-
-urls = [
-    'https://cran.r-project.org/web/packages/xts/index.html',
-    'https://cran.r-project.org/web/packages/data.table/index.html',
-    'https://cran.r-project.org/web/packages/tseries/index.html',
-    'https://cran.r-project.org/web/packages/zoo/index.html',
-    'https://cran.r-project.org/web/packages/tis/index.html',
-    'https://cran.r-project.org/web/packages/tfplot/index.html',
-    'https://cran.r-project.org/web/packages/tframe/index.html',
-    'https://cran.r-project.org/web/packages/IBrokers/index.html',
-    'https://cran.r-project.org/web/packages/Rblpapi/index.html',
-    'https://cran.r-project.org/web/packages/Rbitcoin/index.html',
-    'https://cran.r-project.org/web/packages/GetTDData/index.html',
-    'https://cran.r-project.org/web/packages/GetHFData/index.html',
-    'https://cran.r-project.org/package=td',
-    'https://cran.r-project.org/web/packages/quantmod/index.html',
-    'https://cran.r-project.org/web/packages/fAsianOptions/index.html',
-    'https://cran.r-project.org/web/packages/fAssets/index.html',
-    'https://cran.r-project.org/web/packages/fBasics/index.html',
-    'https://cran.r-project.org/web/packages/fBonds/index.html',
-    'https://cran.r-project.org/web/packages/fExoticOptions/index.html',
-    'https://cran.r-project.org/web/packages/fOptions/index.html',
-    'https://cran.r-project.org/web/packages/fPortfolio/index.html',
-    'https://cran.r-project.org/web/packages/portfolio/index.html',
-    'https://cran.r-project.org/web/packages/portfolioSim/index.html',
-    'https://cran.r-project.org/web/packages/sde/index.html',
-    'https://cran.r-project.org/web/packages/YieldCurve/index.html',
-    'https://cran.r-project.org/web/packages/SmithWilsonYieldCurve/index.html',
-    'https://cran.r-project.org/web/packages/ycinterextra/index.html',
-    'https://cran.r-project.org/web/packages/AmericanCallOpt/index.html',
-    'https://cran.r-project.org/web/packages/VarSwapPrice/index.html',
-    'https://cran.r-project.org/web/packages/RND/index.html',
-    'https://cran.r-project.org/web/packages/LSMonteCarlo/index.html',
-    'https://cran.r-project.org/web/packages/OptHedging/index.html',
-    'https://cran.r-project.org/web/packages/tvm/index.html',
-    'https://cran.r-project.org/web/packages/OptionPricing/index.html',
-    'https://cran.r-project.org/web/packages/credule/index.html',
-    'https://cran.r-project.org/web/packages/derivmkts/index.html',
-    'https://cran.r-project.org/web/packages/PortfolioAnalytics/PortfolioAnalytics.pdf',
-    'https://cran.r-project.org/web/packages/backtest/index.html',
-    'https://cran.r-project.org/web/packages/pa/index.html',
-    'https://cran.r-project.org/web/packages/TTR/index.html',
-    'https://cran.r-project.org/web/packages/PerformanceAnalytics/index.html',
-    'https://cran.r-project.org/web/packages/tseries/index.html',
-    'https://cran.r-project.org/web/packages/zoo/index.html',
-    'https://cran.r-project.org/web/packages/xts/index.html',
-    'https://cran.r-project.org/web/packages/fGarch/index.html',
-    'https://cran.r-project.org/web/packages/timeSeries/index.html',
-    'https://cran.r-project.org/web/packages/rugarch/index.html',
-    'https://cran.r-project.org/web/packages/rmgarch/index.html',
-    'https://cran.r-project.org/web/packages/timeDate/index.html',
-    'https://cran.r-project.org/web/packages/bizdays/index.html',
-]
-
-
-def get_data(url):
-    res = requests.get(url)
-    m = reu.search(res.text)
-    if m:
-        return dict(cran=url, github=m.group(0), repo=m.group(1))
+def make_session(workers):
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def find_github(html):
+    m = reu.search(html)
+    link = classify(m.group(0)) if m else None
+    if link and link.repo:
+        return dict(github=link.url, repo=link.repo)
     else:
+        return dict(github='', repo='')
+
+
+def get_data(url, session, cache):
+    try:
+        res = cache.get(url, lambda headers: session.get(url, headers=headers, timeout=30))
+        res.raise_for_status()
+    except requests.RequestException as e:
+        print(f'ERROR {url}: {e}')
         return dict(cran=url, github='', repo='')
+    return dict(cran=url, **find_github(res.text))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Map CRAN packages to GitHub repos')
+    parser.add_argument('--readme', default='README.md')
+    parser.add_argument('--output', default='cran.csv')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    urls = discover(args.readme)
+    session = make_session(args.workers)
+    cache = HTTPCache(max_age=86400)
+    with open(args.output, 'w', newline='', encoding='utf8') as f, \
+            ThreadPoolExecutor(max_workers=args.workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=['cran', 'github', 'repo'])
+        writer.writeheader()
+        for row in pool.map(lambda url: get_data(url, session, cache), urls):
+            writer.writerow(row)
+    cache.evict()
+    print(f'{len(urls)} packages')
+    print(cache.summary())
 
 
-all_data = [get_data(url) for url in urls]
-df = pd.DataFrame(all_data)
-df.to_csv('cran.csv', index=False)
+if __name__ == '__main__':
+    main()
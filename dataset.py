@@ -0,0 +1,52 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+BOOL_COLUMNS = ['github', 'cran', 'archived']
+DATE_COLUMNS = ['last_commit', 'fetched']
+INT_COLUMNS = ['stars', 'link_status', 'latency_ms']
+
+
+def typed(df):
+    """Copy of the projects frame with real dtypes instead of CSV strings:
+    dates for ``DATE_COLUMNS``, nullable booleans and integers.
+    """
+    df = df.copy()
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors='coerce').dt.date
+    for col in BOOL_COLUMNS:
+        df[col] = df[col].map({True: True, False: False, 'True': True,
+                               'False': False}).astype('boolean')
+    for col in df.columns.intersection(INT_COLUMNS):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    for col in df.columns.difference(DATE_COLUMNS + BOOL_COLUMNS + INT_COLUMNS):
+        df[col] = df[col].fillna('').astype(str)
+    return df
+
+
+def write_parquet(df, path, history=None, run_date=None):
+    """Write the typed projects frame to ``path``.
+
+    With ``history``, also store this run as a hive-style partition
+    ``history/run_date=YYYY-MM-DD/projects.parquet``; rerunning on the same
+    day replaces that day's snapshot. ``pd.read_parquet(history)`` loads
+    all runs with a ``run_date`` column.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print('pyarrow is not installed, skipping Parquet output')
+        return
+    types = {col: pa.date32() for col in DATE_COLUMNS}
+    types.update({col: pa.bool_() for col in BOOL_COLUMNS})
+    types.update({col: pa.int64() for col in INT_COLUMNS})
+    schema = pa.schema([(col, types.get(col, pa.string())) for col in df.columns])
+    table = pa.Table.from_pandas(typed(df), schema=schema, preserve_index=False)
+    pq.write_table(table, path)
+    if history:
+        run_date = run_date or date.today().isoformat()
+        part = os.path.join(history, f'run_date={run_date}')
+        os.makedirs(part, exist_ok=True)
+        pq.write_table(table, os.path.join(part, 'projects.parquet'))
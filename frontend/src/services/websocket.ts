@@ -43,6 +43,24 @@ class WebSocketService {
     }
   }
 
+  subscribeMany(symbols: string[]) {
+    if (this.socket?.connected) {
+      this.socket.emit('message', JSON.stringify({
+        action: 'subscribe',
+        symbols: symbols,
+      }));
+    }
+  }
+
+  subscribeWatchlist(watchlistId: number) {
+    if (this.socket?.connected) {
+      this.socket.emit('message', JSON.stringify({
+        action: 'subscribe_watchlist',
+        watchlist_id: watchlistId,
+      }));
+    }
+  }
+
   unsubscribe(symbol: string) {
     if (this.socket?.connected) {
       this.socket.emit('message', JSON.stringify({
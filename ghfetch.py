@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = 'https://api.github.com'
+
+REPO_FIELDS = '''
+    stargazerCount
+    isArchived
+    defaultBranchRef {
+      name
+      target { ... on Commit { author { date } } }
+    }'''
+
+
+class RateLimiter:
+    """Tracks GitHub's quota headers and holds workers back when it runs low.
+
+    Every response updates ``remaining``/``reset`` from the
+    ``X-RateLimit-*`` headers; ``wait`` blocks the calling worker until the
+    quota window resets once ``remaining`` drops to ``reserve``.
+    """
+
+    def __init__(self, reserve=10, clock=time.time, sleep=time.sleep):
+        self.reserve = reserve
+        self.remaining = None
+        self.reset = 0.0
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        if 'X-RateLimit-Remaining' not in headers:
+            return
+        with self._lock:
+            self.remaining = int(headers['X-RateLimit-Remaining'])
+            self.reset = float(headers.get('X-RateLimit-Reset', 0))
+
+    def delay(self):
+        with self._lock:
+            if self.remaining is None or self.remaining > self.reserve:
+                return 0.0
+            return max(0.0, self.reset - self._clock())
+
+    def wait(self, delay=None):
+        delay = self.delay() if delay is None else delay
+        if delay > 0:
+            self.waited += delay
+            self._sleep(delay)
+
+
+class GitHubClient:
+    """Small REST client over a pooled keep-alive session.
+
+    ``base_url`` can point at a local stub server for testing. With a
+    ``cache`` (see ``httpcache.HTTPCache``) GETs become conditional requests.
+    """
+
+    def __init__(self, token=None, base_url=API_URL, workers=8, retries=3,
+                 timeout=30, limiter=None, session=None, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter()
+        self.cache = cache
+        self.requests = 0
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept'] = 'application/vnd.github+json'
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+
+    def request(self, method, path, **kwargs):
+        url = path if path.startswith('http') else self.base_url + path
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.retries + 1):
+            self.limiter.wait()
+            try:
+                res = self.session.request(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt == self.retries:
+                    raise
+                self.limiter.wait(2 ** attempt)
+                continue
+            self.requests += 1
+            self.limiter.update(res.headers)
+            if attempt < self.retries and self._throttled(res):
+                self.limiter.wait(self._retry_after(res))
+                continue
+            if attempt < self.retries and res.status_code >= 500:
+                self.limiter.wait(2 ** attempt)
+                continue
+            return res
+        return res
+
+    def get(self, path, headers=None, **kwargs):
+        if self.cache is None:
+            return self.request('GET', path, headers=headers, **kwargs)
+        url = path if path.startswith('http') else self.base_url + path
+
+        def send(conditional):
+            return self.request('GET', url, headers={**(headers or {}), **conditional},
+                                **kwargs)
+        return self.cache.get(url, send)
+
+    def graphql(self, query):
+        res = self.request('POST', '/graphql', json={'query': query})
+        res.raise_for_status()
+        return res.json()
+
+    @staticmethod
+    def _throttled(res):
+        if res.status_code == 429:
+            return True
+        return (res.status_code == 403 and
+                (res.headers.get('X-RateLimit-Remaining') == '0' or
+                 'Retry-After' in res.headers))
+
+    def _retry_after(self, res):
+        if 'Retry-After' in res.headers:
+            return float(res.headers['Retry-After'])
+        return max(1.0, self.limiter.delay())
+
+    def get_last_commit(self, repo):
+        try:
+            if repo:
+                res = self.get(f'/repos/{repo}/commits?per_page=1')
+                res.raise_for_status()
+                return res.json()[0]['commit']['author']['date'][:10]
+            else:
+                return ''
+        except Exception:
+            print('ERROR ' + repo)
+            return 'error'
+
+    def get_repo_info(self, repo):
+        """REST fallback: one request for the repo, one for its last commit."""
+        try:
+            res = self.get(f'/repos/{repo}')
+            res.raise_for_status()
+            r = res.json()
+        except Exception:
+            print('ERROR ' + repo)
+            return dict(last_commit='error')
+        return dict(last_commit=self.get_last_commit(repo),
+                    stars=r['stargazers_count'],
+                    archived=r['archived'],
+                    default_branch=r['default_branch'])
+
+    def graphql_repo_info(self, repos):
+        """Resolve many repos in one aliased GraphQL query.
+
+        Repos GitHub cannot resolve are left out of the result so the caller
+        can retry them over REST.
+        """
+        aliases = {}
+        parts = []
+        for i, repo in enumerate(repos):
+            owner, name = repo.split('/', 1)
+            aliases[f'r{i}'] = repo
+            parts.append(f'r{i}: repository(owner: {json.dumps(owner)}, '
+                         f'name: {json.dumps(name)}) {{{REPO_FIELDS}\n  }}')
+        try:
+            data = self.graphql('query {\n' + '\n'.join(parts) + '\n}')['data']
+        except Exception:
+            print(f'ERROR graphql batch of {len(repos)}, falling back to REST')
+            return {}
+        info = {}
+        for alias, r in (data or {}).items():
+            if r is None:
+                continue
+            branch = r['defaultBranchRef'] or {}
+            commit = (branch.get('target') or {}).get('author') or {}
+            info[aliases[alias]] = dict(
+                last_commit=(commit.get('date') or '')[:10],
+                stars=r['stargazerCount'],
+                archived=r['isArchived'],
+                default_branch=branch.get('name', ''))
+        return info
+
+
+def fetch_repo_info(client, repos, batch_size=50, graphql=True):
+    """Fetch last commit, stars, archived flag and default branch per repo.
+
+    With ``graphql`` the repos are resolved ``batch_size`` at a time in
+    aliased GraphQL queries; anything left unresolved goes through the REST
+    fallback on the worker pool.
+    """
+    repos = list(dict.fromkeys(r for r in repos if r))
+    info = {}
+    if graphql:
+        for i in range(0, len(repos), batch_size):
+            info.update(client.graphql_repo_info(repos[i:i + batch_size]))
+    missing = [r for r in repos if r not in info]
+    with ThreadPoolExecutor(max_workers=client.workers) as pool:
+        info.update(zip(missing, pool.map(client.get_repo_info, missing)))
+    return info
@@ -0,0 +1,160 @@
+import argparse
+import sqlite3
+from datetime import date
+
+import pandas as pd
+
+COLUMNS = ['project', 'section', 'url', 'repo', 'last_commit', 'stars', 'archived']
+KEY = ['section', 'project']
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS snapshots (
+    run_date TEXT NOT NULL,
+    project TEXT NOT NULL,
+    section TEXT NOT NULL,
+    url TEXT,
+    repo TEXT,
+    last_commit TEXT,
+    stars INTEGER,
+    archived INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_snapshots_repo_run_date ON snapshots (repo, run_date);
+CREATE INDEX IF NOT EXISTS ix_snapshots_run_date ON snapshots (run_date);
+'''
+
+
+class HistoryStore:
+    """Append-only SQLite store of per-run projects.csv snapshots.
+
+    Past runs are never rewritten; appending a run date that is already
+    stored replaces only that day's snapshot, so reruns are idempotent.
+    All analytics load the needed snapshots once and work on whole columns.
+    """
+
+    def __init__(self, path='site/history.db'):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, df, run_date=None):
+        run_date = run_date or date.today().isoformat()
+        rows = df.reindex(columns=COLUMNS).copy()
+        rows['last_commit'] = pd.to_datetime(rows['last_commit'], errors='coerce').dt.strftime('%Y-%m-%d')
+        rows['stars'] = pd.to_numeric(rows['stars'], errors='coerce').astype('Int64')
+        rows['archived'] = rows['archived'].map({True: 1, False: 0, 'True': 1, 'False': 0})
+        rows.insert(0, 'run_date', run_date)
+        with self.conn:
+            self.conn.execute('DELETE FROM snapshots WHERE run_date = ?', (run_date,))
+            rows.to_sql('snapshots', self.conn, if_exists='append', index=False)
+        return len(rows)
+
+    def run_dates(self):
+        cur = self.conn.execute('SELECT DISTINCT run_date FROM snapshots ORDER BY run_date')
+        return [r[0] for r in cur]
+
+    def snapshots(self, run_dates=None, repo=None):
+        sql = 'SELECT * FROM snapshots'
+        where, params = [], []
+        if repo:
+            where.append('repo = ?')
+            params.append(repo)
+        if run_dates:
+            where.append(f'run_date IN ({",".join("?" * len(run_dates))})')
+            params.extend(run_dates)
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        df = pd.read_sql_query(sql + ' ORDER BY run_date', self.conn, params=params)
+        for col in ['run_date', 'last_commit']:
+            df[col] = pd.to_datetime(df[col])
+        return df
+
+    def inactive(self, days, run_date=None):
+        """Projects of a run (default: latest) with no commit in ``days`` days
+        before that run, stalest first.
+        """
+        if run_date is None:
+            dates = self.run_dates()
+            if not dates:
+                raise ValueError('no runs recorded yet')
+            run_date = dates[-1]
+        df = self.snapshots([run_date])
+        df['idle_days'] = (df['run_date'] - df['last_commit']).dt.days
+        df = df[df['idle_days'] > days]
+        return df.sort_values('idle_days', ascending=False, ignore_index=True)
+
+    def section_activity(self, days=365):
+        """Share of dated projects per (run_date, section) with a commit in the
+        ``days`` before the run, plus their median idle days.
+        """
+        df = self.snapshots().dropna(subset=['last_commit'])
+        df['idle_days'] = (df['run_date'] - df['last_commit']).dt.days
+        df['active'] = df['idle_days'] <= days
+        return (df.groupby(['section', 'run_date'])
+                  .agg(projects=('project', 'size'),
+                       active_share=('active', 'mean'),
+                       median_idle_days=('idle_days', 'median'))
+                  .reset_index())
+
+    def decaying_sections(self, days=365):
+        """Sections whose active share fell between their first and last run."""
+        act = self.section_activity(days).sort_values('run_date')
+        by = act.groupby('section')['active_share']
+        out = pd.DataFrame({'first': by.first(), 'last': by.last(), 'runs': by.size()})
+        out['change'] = out['last'] - out['first']
+        return out[out['change'] < 0].sort_values('change').reset_index()
+
+    def churn(self, before=None, after=None):
+        """Rows added, removed, moved to another URL or with a newer last
+        commit between two runs (default: the last two).
+        """
+        if before is None or after is None:
+            dates = self.run_dates()
+            if len(dates) < 2:
+                raise ValueError(f'churn needs two runs, {len(dates)} recorded')
+            before = before or dates[-2]
+            after = after or dates[-1]
+        df = self.snapshots([before, after])
+        old = df[df['run_date'] == before].drop_duplicates(KEY)
+        new = df[df['run_date'] == after].drop_duplicates(KEY)
+        m = old.merge(new, on=KEY, how='outer', suffixes=('_before', '_after'),
+                      indicator=True)
+        m['change'] = m['_merge'].map({'left_only': 'removed', 'right_only': 'added',
+                                       'both': ''}).astype(str)
+        both = m['_merge'] == 'both'
+        m.loc[both & (m['last_commit_after'] > m['last_commit_before']), 'change'] = 'updated'
+        m.loc[both & (m['url_after'] != m['url_before']), 'change'] = 'url changed'
+        cols = KEY + ['change', 'url_before', 'url_after',
+                      'last_commit_before', 'last_commit_after']
+        return m.loc[m['change'] != '', cols].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query projects history')
+    parser.add_argument('--db', default='site/history.db')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('inactive', help='projects without commits for N days')
+    p.add_argument('--days', type=int, default=730)
+    p = sub.add_parser('decaying', help='sections losing active projects')
+    p.add_argument('--days', type=int, default=365)
+    sub.add_parser('churn', help='changes between the last two runs')
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    try:
+        if args.command == 'inactive':
+            df = store.inactive(args.days)[['project', 'section', 'url', 'last_commit', 'idle_days']]
+        elif args.command == 'decaying':
+            df = store.decaying_sections(args.days)
+        else:
+            df = store.churn()
+    except ValueError as e:
+        parser.exit(1, f'{args.db}: {e}\n')
+    finally:
+        store.close()
+    print(df.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
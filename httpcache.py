@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class CachedResponse:
+    """Response body replayed from the cache, shaped like ``requests.Response``."""
+
+    status_code = 200
+    ok = True
+    from_cache = True
+
+    def __init__(self, entry):
+        self.url = entry['url']
+        self.headers = entry['headers']
+        self.text = entry['body']
+
+    @property
+    def content(self):
+        return self.text.encode('utf8')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        pass
+
+
+class HTTPCache:
+    """On-disk cache of GET responses keyed by URL.
+
+    Stored responses are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``, so unchanged resources come back as bodiless 304s
+    (which GitHub does not count against the rate limit). Responses younger
+    than ``max_age`` seconds are served without a request at all. ``evict``
+    drops entries unused for ``ttl`` seconds, then the least recently used
+    ones until the cache fits in ``max_bytes``; a file's mtime is its last
+    use, refreshed on every hit and revalidation.
+
+    Only GETs go through the cache. GraphQL queries are POSTs and are never
+    cached, so with ``fetch_repo_info``'s default GraphQL mode the cache only
+    serves the REST fallback.
+    """
+
+    def __init__(self, path='.cache/http', ttl=30 * 86400, max_bytes=64 * 2**20,
+                 max_age=0, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evicted = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha1(url.encode()).hexdigest() + '.json')
+
+    def _load(self, url):
+        try:
+            with open(self._file(url), encoding='utf8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('url') == url else None
+
+    def _store(self, entry):
+        fn = self._file(entry['url'])
+        tmp = f'{fn}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf8') as f:
+            json.dump(entry, f)
+        os.replace(tmp, fn)
+
+    def _touch(self, url, now):
+        try:
+            os.utime(self._file(url), (now, now))
+        except OSError:
+            pass
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, url, send):
+        """Return the response for ``url``, calling ``send(headers)`` for the
+        network request when the cached copy is missing or needs revalidation.
+        """
+        entry = self._load(url)
+        now = self._clock()
+        if entry and now - entry['stored_at'] < self.max_age:
+            self._count('hits')
+            self._touch(url, now)
+            return CachedResponse(entry)
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        res = send(headers)
+
+        if res.status_code == 304 and entry:
+            self._count('revalidated')
+            entry['stored_at'] = now
+            self._store(entry)
+            return CachedResponse(entry)
+
+        self._count('misses')
+        etag = res.headers.get('ETag')
+        last_modified = res.headers.get('Last-Modified')
+        if res.status_code == 200 and (etag or last_modified):
+            self._store(dict(
+                url=url,
+                etag=etag,
+                last_modified=last_modified,
+                stored_at=now,
+                headers={'Content-Type': res.headers.get('Content-Type', '')},
+                body=res.text))
+        return res
+
+    def evict(self):
+        now = self._clock()
+        files = []
+        for name in os.listdir(self.path):
+            fn = os.path.join(self.path, name)
+            st = os.stat(fn)
+            if now - st.st_mtime > self.ttl:
+                os.remove(fn)
+                self.evicted += 1
+            else:
+                files.append((st.st_mtime, st.st_size, fn))
+        total = sum(size for _, size, _ in files)
+        for _, size, fn in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(fn)
+            total -= size
+            self.evicted += 1
+
+    def summary(self):
+        return (f'http cache: {self.hits} hits, {self.revalidated} revalidated, '
+                f'{self.misses} misses, {self.evicted} evicted')
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from readme import iter_entries
+
+HEADERS = {'User-Agent': 'awesome-quant-linkcheck'}
+
+
+class LinkChecker:
+    """Probe URLs concurrently: HEAD first, GET when HEAD is refused or fails.
+
+    At most ``per_host`` requests hit the same host at once, connections
+    are pooled per host, and results younger than ``ttl`` seconds are
+    reused from the JSON cache at ``cache_path``. Failures without an HTTP
+    response (timeouts, DNS or connection errors) are only reused for
+    ``failure_ttl`` seconds, as they are often transient.
+    """
+
+    def __init__(self, workers=32, per_host=8, timeout=10,
+                 cache_path='.cache/links.json', ttl=86400, failure_ttl=600,
+                 clock=time.time):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.cached = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hosts = defaultdict(lambda: threading.BoundedSemaphore(per_host))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(HEADERS)
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, encoding='utf8') as f:
+                self.cache = json.load(f)
+
+    def _host(self, url):
+        with self._lock:
+            return self._hosts[urlsplit(url).netloc.lower()]
+
+    def _probe(self, method, url):
+        res = self.session.request(method, url, timeout=self.timeout,
+                                   allow_redirects=True, stream=True)
+        res.close()
+        return res
+
+    def check(self, url):
+        hit = self.cache.get(url)
+        now = self._clock()
+        if hit and now - hit['checked_at'] < (self.ttl if hit['status'] else self.failure_ttl):
+            with self._lock:
+                self.cached += 1
+            return hit
+        error = ''
+        with self._host(url):
+            start = time.perf_counter()  # latency excludes waiting for the host slot
+            try:
+                res = self._probe('HEAD', url)
+                if res.status_code >= 400:
+                    res = self._probe('GET', url)
+            except requests.ConnectionError as e:
+                # unreachable host: a GET would fail the same way
+                res, error = None, type(e).__name__
+            except requests.RequestException:
+                try:
+                    res = self._probe('GET', url)
+                except requests.RequestException as e:
+                    res, error = None, type(e).__name__
+            latency = time.perf_counter() - start
+        result = dict(
+            status=res.status_code if res is not None else 0,
+            final_url=res.url if res is not None and res.url != url else '',
+            latency_ms=round(latency * 1000),
+            error=error,
+            checked_at=now)
+        with self._lock:
+            self.cache[url] = result
+        return result
+
+    def check_all(self, urls):
+        urls = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(urls, pool.map(self.check, urls)))
+
+    def save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf8') as f:
+            json.dump(self.cache, f)
+
+
+def add_link_health(df, checker):
+    """Add link_status, redirect and latency_ms columns for ``df['url']``."""
+    results = checker.check_all(df['url'])
+    df['link_status'] = df['url'].map(lambda u: results[u]['status'])
+    df['redirect'] = df['url'].map(lambda u: results[u]['final_url'])
+    df['latency_ms'] = df['url'].map(lambda u: results[u]['latency_ms'])
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check README links')
+    parser.add_argument('--readme', default='README.md')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--per-host', type=int, default=8)
+    args = parser.parse_args()
+
+    with open(args.readme, 'r', encoding='utf8') as f:
+        urls = [e.url for e in iter_entries(f)]
+    checker = LinkChecker(args.workers, args.per_host)
+    start = time.perf_counter()
+    results = checker.check_all(urls)
+    checker.save()
+    for url, r in results.items():
+        if r['status'] >= 400 or r['status'] == 0:
+            print(f"{r['status'] or r['error']} {url}")
+        elif r['final_url']:
+            print(f"{r['status']} {url} -> {r['final_url']}")
+    print(f'{len(results)} links checked in {time.perf_counter() - start:.1f}s '
+          f'({checker.cached} from cache)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import re
+from functools import lru_cache
+
+# one pass over the URL; only the group of the matching host is set
+rel = re.compile(r'''
+    ^(?:https?://)?(?:www\.)?
+    (?:
+        github\.com/(?!(?:orgs|topics|sponsors|marketplace|collections|features)/)
+            (?P<github>[\w-]+/[\w.-]+)
+      # groups nest, so the slug ends at '/-/' or a legacy subpage (repo/issues)
+      | gitlab\.com/(?P<gitlab>[\w.-]+(?:/(?!(?:-|issues|merge_requests|tree|blob|commits?
+            |raw|wikis|pipelines|tags|branches)(?:[/?\#]|$))[\w.-]+)+)
+      | bitbucket\.org/(?P<bitbucket>[\w.-]+/[\w.-]+)
+      | cran\.r-project\.org/(?:web/packages/|package=)(?P<cran>[\w.]+)
+      | pypi(?:\.python)?\.org/(?:project|pypi)/(?P<pypi>[\w.-]+)
+    )
+    (?:[/?#].*)?$
+''', re.VERBOSE | re.IGNORECASE)
+
+CANONICAL = {
+    'github': 'https://github.com/{}',
+    'gitlab': 'https://gitlab.com/{}',
+    'bitbucket': 'https://bitbucket.org/{}',
+    'cran': 'https://cran.r-project.org/web/packages/{}/index.html',
+    'pypi': 'https://pypi.org/project/{}/',
+}
+
+
+class Link:
+    """A README URL resolved to its hosting service.
+
+    ``host`` is one of the ``CANONICAL`` keys, or '' for any other site;
+    ``slug`` is ``owner/repo`` on code hosts and the package name on CRAN
+    and PyPI; ``url`` is the canonical form of the link.
+    """
+
+    __slots__ = ('url', 'host', 'slug')
+
+    def __init__(self, url, host='', slug=''):
+        self.url = url
+        self.host = host
+        self.slug = slug
+
+    @property
+    def repo(self):
+        return self.slug if self.host == 'github' else ''
+
+    def __eq__(self, other):
+        return (isinstance(other, Link) and
+                (self.url, self.host, self.slug) == (other.url, other.host, other.slug))
+
+    def __repr__(self):
+        return f'Link({self.url!r}, {self.host!r}, {self.slug!r})'
+
+
+@lru_cache(maxsize=4096)
+def classify(url):
+    url = url.strip()
+    m = rel.match(url)
+    if not m:
+        return Link(url)
+    host = m.lastgroup
+    slug = m.group(host)
+    if host in ('github', 'gitlab', 'bitbucket') and slug.endswith('.git'):
+        slug = slug[:-4]
+    return Link(CANONICAL[host].format(slug), host, slug)
@@ -1,96 +1,131 @@
-
-
+import argparse
 import os
-import re
-import pandas as pd
-from threading import Thread
-
-from github import Github
-
-# using an access token
-g = Github(os.environ['GITHUB_ACCESS_TOKEN'])
+from datetime import date
 
+import pandas as pd
 
-def extract_repo(url):
-    reu = re.compile(r'^https://github.com/([\w-]+/[-\w\.]+)$')
-    m = reu.match(url)
-    if m:
-        return m.group(1)
+from dataset import write_parquet
+from ghfetch import GitHubClient, fetch_repo_info
+from history import HistoryStore
+from httpcache import HTTPCache
+from linkcheck import LinkChecker, add_link_health
+from readme import iter_entries
+
+# columns filled from GitHub; ``fetched`` is the date they were last fetched
+META = ['last_commit', 'stars', 'archived', 'default_branch', 'fetched']
+
+
+def parse_readme(path):
+    with open(path, 'r', encoding='utf8') as f:
+        return [dict(project=e.project, section=e.section, last_commit='',
+                     url=e.url, description=e.description, github=e.github,
+                     cran=e.cran, repo=e.repo, host=e.host, stars=None, archived=None,
+                     default_branch='', fetched='')
+                for e in iter_entries(f)]
+
+
+def plan_refresh(projects, previous, stale_days=7, today=None):
+    """Diff parsed README entries against the previous projects.csv.
+
+    Rows are matched on (section, project). Returns the entries with the
+    previous metadata carried over, and a mask of the rows to refetch: new
+    entries, entries whose URL changed, and entries whose metadata was
+    fetched more than ``stale_days`` ago or failed last time.
+    """
+    today = pd.Timestamp(today or date.today())
+    key = ['section', 'project']
+    prev = (previous.reindex(columns=key + ['url'] + META, fill_value='')
+            .drop_duplicates(key)
+            .rename(columns={'url': 'prev_url'}))
+    df = projects.drop(columns=META).merge(prev, on=key, how='left', indicator=True)
+    new = df.pop('_merge').eq('left_only').to_numpy()
+    changed = ~new & df['url'].ne(df.pop('prev_url')).to_numpy()
+    df.loc[new | changed, META] = ''
+
+    fetched = pd.to_datetime(df['fetched'], errors='coerce')
+    stale = (fetched.isna() | (fetched < today - pd.Timedelta(days=stale_days)) |
+             df['last_commit'].eq('error'))
+    refresh = df['repo'].ne('') & (new | changed | stale)
+
+    removed = (~prev.set_index(key).index.isin(df.set_index(key).index)).sum()
+    print(f'{new.sum()} new, {removed} removed, {changed.sum()} url changed, '
+          f'{(stale & ~new & ~changed & df["repo"].ne("")).sum()} stale; '
+          f'fetching {refresh.sum()} of {df["repo"].ne("").sum()} repos')
+    return df[projects.columns], refresh
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build site/projects.csv')
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('PARSE_WORKERS', 8)),
+                        help='maximum concurrent GitHub requests')
+    parser.add_argument('--api-url', default=os.environ.get(
+        'GITHUB_API_URL', 'https://api.github.com'))
+    parser.add_argument('--mode', choices=['graphql', 'rest'],
+                        help='metadata source (default: graphql when a token '
+                             'is set, since GraphQL requires auth)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='repos per GraphQL query')
+    parser.add_argument('--cache-dir', default='.cache/http',
+                        help="conditional-request cache directory for REST GETs "
+                             "('' disables; GraphQL queries are not cached)")
+    parser.add_argument('--incremental', action='store_true',
+                        help='only refetch new, changed or stale rows of --output')
+    parser.add_argument('--stale-days', type=int, default=7,
+                        help='refetch rows whose metadata is older than this')
+    parser.add_argument('--check-links', action='store_true',
+                        help='probe every URL and record status, redirect, latency')
+    parser.add_argument('--readme', default='README.md')
+    parser.add_argument('--output', default='site/projects.csv')
+    parser.add_argument('--parquet', default='',
+                        help='also write a typed Parquet copy here (needs pyarrow)')
+    parser.add_argument('--history', default='',
+                        help='directory for per-run Parquet snapshots')
+    parser.add_argument('--store', default='',
+                        help='SQLite history database to append this run to')
+    args = parser.parse_args()
+
+    token = os.environ.get('GITHUB_ACCESS_TOKEN')
+    mode = args.mode or ('graphql' if token else 'rest')
+    cache = HTTPCache(args.cache_dir) if args.cache_dir else None
+    client = GitHubClient(token, base_url=args.api_url, workers=args.workers,
+                          cache=cache)
+    df = pd.DataFrame(parse_readme(args.readme))
+    if args.incremental and os.path.exists(args.output):
+        previous = pd.read_csv(args.output, dtype=str, keep_default_na=False)
+        df, refresh = plan_refresh(df, previous, args.stale_days)
     else:
-        return ''
-
-
-def get_last_commit(repo):
-    try:
-        if repo:
-            r = g.get_repo(repo)
-            cs = r.get_commits()
-            return cs[0].commit.author.date.strftime('%Y-%m-%d')
-        else:
-            return ''
-    except:
-        print('ERROR ' + repo)
-        return 'error'
-
-
-class Project(Thread):
-
-    def __init__(self, match, section):
-        super().__init__()
-        self._match = match
-        self.regs = None
-        self._section = section
-
-    def run(self):
-        m = self._match
-        is_github = 'github.com' in m.group(2)
-        is_cran = 'cran.r-project.org' in m.group(2)
-        repo = extract_repo(m.group(2))
-        print(repo)
-        last_commit = get_last_commit(repo)
-        self.regs = dict(
-            project=m.group(1),
-            section=self._section,
-            last_commit=last_commit,
-            url=m.group(2),
-            description=m.group(3),
-            github=is_github,
-            cran=is_cran,
-            repo=repo
-        )
-
-
-projects = []
-
-with open('README.md', 'r', encoding='utf8') as f:
-    ret = re.compile(r'^(#+) (.*)$')
-    rex = re.compile(r'^\s*- \[(.*)\]\((.*)\) - (.*)$')
-    m_titles = []
-    last_head_level = 0
-    for line in f:
-        m = rex.match(line)
-        if m:
-            p = Project(m, ' > '.join(m_titles[1:]))
-            p.start()
-            projects.append(p)
-        else:
-            m = ret.match(line)
-            if m:
-                hrs = m.group(1)
-                if len(hrs) > last_head_level:
-                    m_titles.append(m.group(2))
-                else:
-                    for n in range(last_head_level - len(hrs) + 1):
-                        m_titles.pop()
-                    m_titles.append(m.group(2))
-                last_head_level = len(hrs)
-
-while True:
-    checks = [not p.is_alive() for p in projects]
-    if all(checks):
-        break
-
-projects = [p.regs for p in projects]
-df = pd.DataFrame(projects)
-df.to_csv('site/projects.csv', index=False)
-# df.to_markdown('projects.md', index=False)
+        refresh = df['repo'].ne('')
+
+    info = fetch_repo_info(client, df.loc[refresh, 'repo'],
+                           batch_size=args.batch_size,
+                           graphql=mode == 'graphql')
+    meta = pd.DataFrame.from_dict(info, orient='index')
+    for col in meta.columns:
+        df.loc[refresh, col] = df.loc[refresh, 'repo'].map(meta[col])
+    df.loc[refresh, 'fetched'] = date.today().isoformat()
+
+    print(f'{client.requests} requests, waited {client.limiter.waited:.0f}s '
+          f'for rate limit, {client.limiter.remaining} remaining')
+    if cache:
+        cache.evict()
+        print(cache.summary())
+    if args.check_links:
+        checker = LinkChecker()
+        add_link_health(df, checker)
+        checker.save()
+        print(f'{(~df["link_status"].between(1, 399)).sum()} broken, '
+              f'{df["redirect"].ne("").sum()} redirected links '
+              f'({checker.cached} cached)')
+    df.to_csv(args.output, index=False)
+    if args.parquet:
+        write_parquet(df, args.parquet, args.history)
+    if args.store:
+        store = HistoryStore(args.store)
+        print(f'{store.append(df)} rows appended to {args.store}')
+        store.close()
+    # df.to_markdown('projects.md', index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import re
+
+from links import classify
+
+ret = re.compile(r'^(#+) (.*)$')
+rex = re.compile(r'^\s*- \[([^\]]*)\]\(([^)\s]*)\) - (.*)$')
+
+
+def extract_repo(url):
+    return classify(url).repo
+
+
+class Entry:
+    """One ``- [project](url) - description`` line of the README."""
+
+    __slots__ = ('project', 'section', 'url', 'description', 'github', 'cran',
+                 'repo', 'host')
+
+    def __init__(self, project, section, url, description):
+        link = classify(url)
+        self.project = project
+        self.section = section
+        self.url = url
+        self.description = description
+        self.github = 'github.com' in url
+        self.cran = 'cran.r-project.org' in url
+        self.repo = link.repo
+        self.host = link.host
+
+    def as_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self):
+        return f'Entry({self.project!r}, {self.section!r}, {self.url!r})'
+
+
+def iter_entries(lines):
+    """Yield an ``Entry`` per project line of ``lines``, in order.
+
+    ``section`` is the heading path joined with ' > ', leaving out the
+    top-level title. Does no I/O: pass an open file or any iterable of lines.
+    """
+    m_titles = []
+    last_head_level = 0
+    section = ''
+    for line in lines:
+        if line.startswith('#'):
+            m = ret.match(line)
+            if m:
+                level = len(m.group(1))
+                if level <= last_head_level:
+                    del m_titles[max(0, len(m_titles) - (last_head_level - level + 1)):]
+                m_titles.append(m.group(2))
+                last_head_level = level
+                section = ' > '.join(m_titles[1:])
+        elif '- [' in line:
+            m = rex.match(line)
+            if m:
+                yield Entry(m.group(1), section, m.group(2), m.group(3))
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubGitHub(ThreadingHTTPServer):
+    """Local stand-in for api.github.com serving canned commit data."""
+
+    def __init__(self, commits, remaining=5000, reset=0, graphql=True, topics=None):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.commits = commits
+        self.remaining = remaining
+        self.reset = reset
+        self.graphql = graphql
+        self.topics = topics or {}
+        self.paths = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _enter(self, counted=True):
+        srv = self.server
+        with srv.lock:
+            srv.paths.append(self.path)
+            srv.active += 1
+            srv.peak = max(srv.peak, srv.active)
+            if counted:
+                srv.remaining = max(0, srv.remaining - 1)
+            return srv.remaining
+
+    def _leave(self):
+        with self.server.lock:
+            self.server.active -= 1
+
+    def do_GET(self):
+        srv = self.server
+        parts = urlparse(self.path).path.strip('/').split('/')
+        repo = '/'.join(parts[1:3])
+        etag = '"%s"' % hashlib.sha1(srv.commits.get(repo, '').encode()).hexdigest()
+        not_modified = self.headers.get('If-None-Match') == etag
+        # like GitHub, conditional requests answered with 304 are free
+        remaining = self._enter(counted=not not_modified)
+        try:
+            if parts == ['search', 'repositories']:
+                return self._search(remaining)
+            if parts[0] == 'repos' and parts[3:] == ['commits'] and repo in srv.commits:
+                if not_modified:
+                    return self._send(304, None, remaining)
+                date = srv.commits[repo]
+                self._send(200, [{'commit': {'author': {'date': date}}}], remaining,
+                           etag=etag)
+            elif parts[0] == 'repos' and len(parts) == 3 and repo in srv.commits:
+                self._send(200, {'stargazers_count': 10, 'archived': False,
+                                 'default_branch': 'main'}, remaining)
+            else:
+                self._send(404, {'message': 'Not Found'}, remaining)
+        finally:
+            self._leave()
+
+    def _search(self, remaining):
+        qs = parse_qs(urlparse(self.path).query)
+        terms = dict(t.split(':', 1) for t in qs['q'][0].split())
+        min_stars = int(terms['stars'].lstrip('>='))
+        per_page, page = int(qs['per_page'][0]), int(qs['page'][0])
+        repos = sorted((r for r in self.server.topics.get(terms['topic'], [])
+                        if r[1] >= min_stars), key=lambda r: -r[1])
+        items = [dict(full_name=name, stargazers_count=stars, language='Python',
+                      html_url=f'https://github.com/{name}', description='',
+                      updated_at='2024-01-01T00:00:00Z', archived=False)
+                 for name, stars in repos[(page - 1) * per_page:page * per_page]]
+        self._send(200, {'total_count': len(repos), 'items': items}, remaining)
+
+    def do_POST(self):
+        srv = self.server
+        remaining = self._enter()
+        try:
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            if self.path != '/graphql' or not srv.graphql:
+                return self._send(502, {'message': 'Bad Gateway'}, remaining)
+            query = json.loads(body)['query']
+            data = {}
+            for alias, owner, name in re.findall(
+                    r'(\w+): repository\(owner: "(.*?)", name: "(.*?)"\)', query):
+                date = srv.commits.get(f'{owner}/{name}')
+                data[alias] = date and {
+                    'stargazerCount': 10, 'isArchived': False,
+                    'defaultBranchRef': {'name': 'main', 'target': {
+                        'author': {'date': date}}}}
+            self._send(200, {'data': data}, remaining)
+        finally:
+            self._leave()
+
+    def _send(self, status, payload, remaining, etag=None):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Remaining', str(remaining))
+        self.send_header('X-RateLimit-Reset', str(self.server.reset))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
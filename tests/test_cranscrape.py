@@ -0,0 +1,26 @@
+from cranscrape import discover, normalize
+
+
+def test_normalize_package_forms():
+    url = 'https://cran.r-project.org/web/packages/xts/index.html'
+    assert normalize(url) == url
+    assert normalize('https://cran.r-project.org/package=td') == \
+        'https://cran.r-project.org/web/packages/td/index.html'
+    assert normalize('https://CRAN.R-project.org/package=data.table') == \
+        'https://cran.r-project.org/web/packages/data.table/index.html'
+    assert normalize('https://cran.r-project.org/web/packages/PortfolioAnalytics/'
+                     'PortfolioAnalytics.pdf') == \
+        'https://cran.r-project.org/web/packages/PortfolioAnalytics/index.html'
+    assert normalize('https://github.com/joshuaulrich/xts') == ''
+
+
+def test_discover_dedupes(tmp_path):
+    readme = tmp_path / 'README.md'
+    readme.write_text(
+        '- [zoo](https://cran.r-project.org/web/packages/zoo/index.html) - zoo\n'
+        '- [td](https://cran.r-project.org/package=td) - td\n'
+        '- [zoo](https://cran.r-project.org/package=zoo) - zoo again\n')
+    assert discover(str(readme)) == [
+        'https://cran.r-project.org/web/packages/zoo/index.html',
+        'https://cran.r-project.org/web/packages/td/index.html',
+    ]
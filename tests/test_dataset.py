@@ -0,0 +1,30 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from dataset import write_parquet
+
+pytest.importorskip('pyarrow')
+
+
+def test_write_parquet_types_and_history(tmp_path):
+    df = pd.DataFrame(dict(
+        project=['finta', 'numpy'], section=['Python', 'Python'],
+        last_commit=['2024-01-02', ''], url=['https://github.com/a/b', 'https://numpy.org'],
+        description=['', ''], github=['True', 'False'], cran=[False, False],
+        repo=['a/b', ''], host=['github', ''], stars=['12', ''],
+        archived=['False', ''], default_branch=['main', ''], fetched=['2024-01-03', '']))
+    history = tmp_path / 'history'
+    write_parquet(df, tmp_path / 'p.parquet', history, run_date='2024-01-03')
+    write_parquet(df.iloc[:1], tmp_path / 'p.parquet', history, run_date='2024-01-04')
+
+    out = pd.read_parquet(tmp_path / 'p.parquet')
+    assert out['last_commit'].tolist() == [datetime.date(2024, 1, 2)]
+    assert out['stars'].dtype == 'Int64'
+    assert out['github'].dtype == 'boolean'
+
+    runs = pd.read_parquet(history)
+    assert runs.groupby('run_date', observed=True).size().to_dict() == \
+        {'2024-01-03': 2, '2024-01-04': 1}
+    assert runs['archived'].isna().sum() == 1
@@ -0,0 +1,47 @@
+from ghfetch import GitHubClient, RateLimiter, fetch_repo_info
+from stub_github import StubGitHub
+
+COMMITS = {f'owner/repo{i}': f'2024-01-{i % 28 + 1:02d}T10:00:00Z' for i in range(40)}
+
+
+def test_fetch_repo_info_rest_bounded():
+    with StubGitHub(COMMITS) as srv:
+        client = GitHubClient(base_url=srv.url, workers=4)
+        repos = list(COMMITS) + ['', 'owner/missing', 'owner/repo0']
+        info = fetch_repo_info(client, repos, graphql=False)
+    assert info['owner/repo3']['last_commit'] == '2024-01-04'
+    assert info['owner/missing'] == dict(last_commit='error')
+    assert '' not in info
+    # repo and last commit per repo, one failed lookup for the missing one
+    assert len(srv.paths) == 2 * len(COMMITS) + 1
+    assert srv.peak <= 4
+
+
+def test_rate_limiter_waits_for_reset():
+    slept = []
+    limiter = RateLimiter(reserve=2, clock=lambda: 1000.0, sleep=slept.append)
+    with StubGitHub(COMMITS, remaining=3, reset=1030) as srv:
+        client = GitHubClient(base_url=srv.url, workers=1, limiter=limiter)
+        fetch_repo_info(client, ['owner/repo1'], graphql=False)
+    assert limiter.remaining == 1
+    assert slept == [30.0]
+
+
+def test_fetch_repo_info_graphql_batches():
+    with StubGitHub(COMMITS) as srv:
+        client = GitHubClient(base_url=srv.url, workers=4)
+        info = fetch_repo_info(client, list(COMMITS) + ['owner/missing'],
+                               batch_size=16)
+    assert info['owner/repo5'] == dict(last_commit='2024-01-06', stars=10,
+                                       archived=False, default_branch='main')
+    assert info['owner/missing'] == dict(last_commit='error')
+    # 3 GraphQL batches plus one REST lookup for the unresolved repo
+    assert len(srv.paths) == 4
+
+
+def test_fetch_repo_info_rest_fallback():
+    with StubGitHub(COMMITS, graphql=False) as srv:
+        client = GitHubClient(base_url=srv.url, workers=4, retries=0)
+        info = fetch_repo_info(client, ['owner/repo1', 'owner/repo2'])
+    assert info['owner/repo2']['last_commit'] == '2024-01-03'
+    assert info['owner/repo2']['default_branch'] == 'main'
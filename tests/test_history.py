@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from history import HistoryStore
+
+
+def run(*rows):
+    return pd.DataFrame(rows, columns=['project', 'section', 'url', 'repo',
+                                       'last_commit', 'stars', 'archived'])
+
+
+def test_history_analytics(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.append(run(
+        ('a', 'Python', 'https://github.com/o/a', 'o/a', '2023-12-01', 10, False),
+        ('b', 'Python', 'https://github.com/o/b', 'o/b', '2020-01-01', 5, True),
+        ('c', 'R', 'https://c.org', '', '', None, None),
+    ), run_date='2024-01-01')
+    store.append(run(('stale', 'R', 'x', '', '', None, None)), run_date='2024-06-01')
+    store.append(run(
+        ('a', 'Python', 'https://github.com/o/a', 'o/a', '2024-01-15', 12, False),
+        ('b', 'Python', 'https://github.com/o/b2', 'o/b2', '2020-01-01', 5, True),
+        ('d', 'R', 'https://d.org', '', '', None, None),
+    ), run_date='2024-06-01')
+
+    assert store.run_dates() == ['2024-01-01', '2024-06-01']
+    assert len(store.snapshots(repo='o/a')) == 2
+
+    inactive = store.inactive(365)
+    assert inactive['project'].tolist() == ['b']
+
+    churn = store.churn().set_index('project')['change'].to_dict()
+    assert churn == {'a': 'updated', 'b': 'url changed', 'c': 'removed', 'd': 'added'}
+
+    assert store.decaying_sections(days=150).empty
+    decaying = store.decaying_sections(days=60)
+    assert decaying['section'].tolist() == ['Python']
+    store.close()
+
+
+def test_too_few_runs(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    with pytest.raises(ValueError, match='no runs'):
+        store.inactive(30)
+    store.append(run(('A', 'S', 'https://github.com/a/a', 'a/a', '2024-01-01', 1, False)),
+                 run_date='2024-06-01')
+    with pytest.raises(ValueError, match='two runs, 1 recorded'):
+        store.churn()
+    assert len(store.inactive(30)) == 1
+    store.close()
@@ -0,0 +1,63 @@
+import os
+
+from ghfetch import GitHubClient
+from httpcache import HTTPCache
+from stub_github import StubGitHub
+
+COMMITS = {f'owner/repo{i}': f'2024-02-{i + 1:02d}T10:00:00Z' for i in range(10)}
+
+
+def last_commits(client):
+    return {repo: client.get_last_commit(repo) for repo in COMMITS}
+
+
+def test_conditional_requests_revalidate(tmp_path):
+    with StubGitHub(COMMITS) as srv:
+        cache = HTTPCache(str(tmp_path))
+        client = GitHubClient(base_url=srv.url, cache=cache)
+        first = last_commits(client)
+        remaining = srv.remaining
+
+        cache = HTTPCache(str(tmp_path))
+        client = GitHubClient(base_url=srv.url, cache=cache)
+        second = last_commits(client)
+    assert first == second
+    assert (cache.hits, cache.revalidated, cache.misses) == (0, 10, 0)
+    assert srv.remaining == remaining
+
+
+def test_max_age_serves_without_request(tmp_path):
+    with StubGitHub(COMMITS) as srv:
+        cache = HTTPCache(str(tmp_path), max_age=3600)
+        client = GitHubClient(base_url=srv.url, cache=cache)
+        last_commits(client)
+        last_commits(client)
+    assert (cache.hits, cache.misses) == (10, 10)
+    assert len(srv.paths) == 10
+
+
+def test_evict_ttl_and_size(tmp_path):
+    cache = HTTPCache(str(tmp_path), ttl=100, max_bytes=250)
+    for i in range(5):
+        cache._store(dict(url=f'u{i}', body='x' * 50, stored_at=0))
+        os.utime(cache._file(f'u{i}'), (1000 + i, 1000 + i))
+    os.utime(cache._file('u0'), (0, 0))
+    cache._clock = lambda: 1050
+    cache.evict()
+    assert cache._load('u0') is None
+    assert cache._load('u4') is not None
+    assert sum(os.path.getsize(os.path.join(tmp_path, f))
+               for f in os.listdir(tmp_path)) <= 250
+
+
+def test_hit_counts_as_use_for_eviction(tmp_path):
+    cache = HTTPCache(str(tmp_path), ttl=100, max_age=3600, clock=lambda: 1050)
+    for i in range(2):
+        cache._store(dict(url=f'u{i}', headers={}, body='"x"', stored_at=1000))
+        os.utime(cache._file(f'u{i}'), (900, 900))
+    assert cache.get('u0', send=None).json() == 'x'
+    assert cache.hits == 1
+    cache._clock = lambda: 1010
+    cache.evict()
+    assert cache._load('u0') is not None
+    assert cache._load('u1') is None
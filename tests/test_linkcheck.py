@@ -0,0 +1,104 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from linkcheck import LinkChecker, add_link_health
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._reply(head=True)
+
+    def do_GET(self):
+        self._reply(head=False)
+
+    def _reply(self, head):
+        srv = self.server
+        with srv.lock:
+            srv.active += 1
+            srv.peak = max(srv.peak, srv.active)
+            srv.calls.append((self.command, self.path))
+        time.sleep(0.02)
+        with srv.lock:
+            srv.active -= 1
+        if self.path == '/moved':
+            self.send_response(301)
+            self.send_header('Location', '/ok')
+        elif self.path == '/no-head' and head:
+            self.send_response(405)
+        elif self.path in ('/ok', '/no-head') or self.path.startswith('/p'):
+            self.send_response(200)
+        else:
+            self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+def serve():
+    srv = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    srv.lock, srv.active, srv.peak, srv.calls = threading.Lock(), 0, 0, []
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f'http://127.0.0.1:{srv.server_address[1]}'
+
+
+def test_check_all(tmp_path):
+    srv, base = serve()
+    cache = str(tmp_path / 'links.json')
+    checker = LinkChecker(workers=16, per_host=3, cache_path=cache)
+    urls = [f'{base}/ok', f'{base}/moved', f'{base}/no-head', f'{base}/gone',
+            'http://127.0.0.1:1/refused'] + [f'{base}/p{i}' for i in range(12)]
+    results = checker.check_all(urls)
+    checker.save()
+
+    assert results[f'{base}/ok']['status'] == 200
+    assert results[f'{base}/moved']['final_url'] == f'{base}/ok'
+    assert results[f'{base}/no-head']['status'] == 200
+    assert ('GET', '/no-head') in srv.calls
+    assert results[f'{base}/gone']['status'] == 404
+    assert results['http://127.0.0.1:1/refused']['status'] == 0
+    assert srv.peak <= 3
+
+    calls = len(srv.calls)
+    df = add_link_health(pd.DataFrame({'url': [f'{base}/ok', f'{base}/gone']}),
+                         LinkChecker(cache_path=cache))
+    assert df['link_status'].tolist() == [200, 404]
+    assert len(srv.calls) == calls
+    srv.shutdown()
+
+
+def test_failures_expire_sooner(tmp_path):
+    srv, base = serve()
+    now = [1000.0]
+    checker = LinkChecker(cache_path=None, ttl=3600, failure_ttl=60, clock=lambda: now[0])
+    refused = 'http://127.0.0.1:1/refused'
+    checker.check_all([refused, f'{base}/ok'])
+    now[0] += 30
+    checker.check_all([refused, f'{base}/ok'])
+    assert checker.cached == 2
+    now[0] += 60
+    checker.check_all([refused, f'{base}/ok'])
+    assert checker.cached == 3  # the failure was probed again
+    srv.shutdown()
+
+
+def test_latency_excludes_waiting_for_the_host():
+    srv, base = serve()
+    checker = LinkChecker(per_host=1, cache_path=None)
+    url = f'{base}/ok'
+    slot = checker._host(url)
+    slot.acquire()  # another request to the host is in flight
+    results = {}
+    worker = threading.Thread(target=lambda: results.update(r=checker.check(url)))
+    worker.start()
+    time.sleep(0.5)
+    slot.release()
+    worker.join()
+    assert results['r']['status'] == 200
+    assert results['r']['latency_ms'] < 500
+    srv.shutdown()
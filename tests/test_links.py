@@ -0,0 +1,46 @@
+import pytest
+
+from cranscrape import find_github
+from links import Link, classify
+from readme import extract_repo
+
+
+@pytest.mark.parametrize('url, host, slug', [
+    # rows the old exact-match extractor left without a repo
+    ('https://github.com/tradingstrategy-ai/trading-strategy/', 'github',
+     'tradingstrategy-ai/trading-strategy'),
+    ('https://github.com/rburkholder/trade-frame/tree/master/lib/TFOptions', 'github',
+     'rburkholder/trade-frame'),
+    ('https://github.com/auto-differentiation/xad/', 'github', 'auto-differentiation/xad'),
+    ('https://github.com/joshuaulrich/xts.git', 'github', 'joshuaulrich/xts'),
+    ('http://www.github.com/Rdatatable/data.table#readme', 'github',
+     'Rdatatable/data.table'),
+    ('https://github.com/cerlymarco', '', ''),
+    ('https://github.com/topics/quant', '', ''),
+    ('https://gitlab.com/group/sub/project/-/tree/main', 'gitlab', 'group/sub/project'),
+    ('https://gitlab.com/owner/repo/issues', 'gitlab', 'owner/repo'),
+    ('https://gitlab.com/owner/repo/blob/master/README.md', 'gitlab', 'owner/repo'),
+    ('https://bitbucket.org/owner/repo.git', 'bitbucket', 'owner/repo'),
+    ('https://CRAN.R-project.org/package=data.table', 'cran', 'data.table'),
+    ('https://cran.r-project.org/web/packages/xts/index.html', 'cran', 'xts'),
+    ('https://pypi.python.org/pypi/pyfolio', 'pypi', 'pyfolio'),
+    ('https://pypi.org/project/ta-lib/0.4.0/', 'pypi', 'ta-lib'),
+    ('https://www.numpy.org', '', ''),
+])
+def test_classify(url, host, slug):
+    link = classify(url)
+    assert (link.host, link.slug) == (host, slug)
+    assert extract_repo(url) == (slug if host == 'github' else '')
+
+
+def test_canonical_url():
+    assert classify('https://github.com/a/b/issues/1') == \
+        Link('https://github.com/a/b', 'github', 'a/b')
+    assert classify('https://cran.r-project.org/package=td').url == \
+        'https://cran.r-project.org/web/packages/td/index.html'
+
+
+def test_cran_page_keeps_dotted_repo_names():
+    html = '<a href="https://github.com/Rdatatable/data.table">repo</a>'
+    assert find_github(html) == dict(github='https://github.com/Rdatatable/data.table',
+                                     repo='Rdatatable/data.table')
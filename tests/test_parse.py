@@ -0,0 +1,34 @@
+import pandas as pd
+
+from parse import plan_refresh
+
+
+def entry(project, url, repo='', section='Python > Indicators'):
+    return dict(project=project, section=section, last_commit='', url=url,
+                description='', github=bool(repo), cran=False, repo=repo,
+                stars=None, archived=None, default_branch='', fetched='')
+
+
+def test_plan_refresh_only_touches_changed_rows():
+    previous = pd.DataFrame([
+        {**entry('finta', 'https://github.com/peerchemist/finta', 'peerchemist/finta'),
+         'last_commit': '2023-01-01', 'stars': '2000', 'fetched': '2024-03-09'},
+        {**entry('talipp', 'https://github.com/nardew/talipp', 'nardew/talipp'),
+         'last_commit': '2024-01-01', 'fetched': '2024-03-09'},
+        {**entry('old', 'https://github.com/a/old', 'a/old'), 'fetched': '2024-01-01'},
+        {**entry('gone', 'https://github.com/a/gone', 'a/gone'), 'fetched': '2024-03-09'},
+        {**entry('numpy', 'https://www.numpy.org'), 'fetched': ''},
+    ]).astype(str)
+    projects = pd.DataFrame([
+        entry('finta', 'https://github.com/peerchemist/finta', 'peerchemist/finta'),
+        entry('talipp', 'https://github.com/nardew/talipp2', 'nardew/talipp2'),
+        entry('old', 'https://github.com/a/old', 'a/old'),
+        entry('numpy', 'https://www.numpy.org'),
+        entry('new', 'https://github.com/a/new', 'a/new'),
+    ])
+    df, refresh = plan_refresh(projects, previous, stale_days=7, today='2024-03-10')
+    assert list(df.loc[refresh, 'project']) == ['talipp', 'old', 'new']
+    finta = df.iloc[0]
+    assert (finta['last_commit'], finta['stars']) == ('2023-01-01', '2000')
+    assert df.loc[1, 'last_commit'] == ''
+    assert list(df['project']) == list(projects['project'])
@@ -0,0 +1,43 @@
+from readme import Entry, iter_entries
+
+README = '''# Awesome Quant
+
+## Python
+
+### Indicators
+
+- [finta](https://github.com/peerchemist/finta) - Indicators in Pandas.
+  - [nested](https://example.com) - Nested item.
+
+## R
+
+- [xts](https://cran.r-project.org/web/packages/xts/index.html) - eXtensible Time Series.
+
+#### Deep
+
+- [deep](https://github.com/a/deep) - Deep heading.
+
+## Julia
+
+not a project line
+'''
+
+
+def test_iter_entries_tracks_sections():
+    entries = list(iter_entries(README.splitlines(keepends=True)))
+    assert [(e.project, e.section) for e in entries] == [
+        ('finta', 'Python > Indicators'),
+        ('nested', 'Python > Indicators'),
+        ('xts', 'R'),
+        ('deep', 'R > Deep'),
+    ]
+    finta, _, xts, _ = entries
+    assert (finta.github, finta.cran, finta.repo) == (True, False, 'peerchemist/finta')
+    assert (xts.github, xts.cran, xts.repo) == (False, True, '')
+    assert finta.description == 'Indicators in Pandas.'
+
+
+def test_entry_is_slotted():
+    e = Entry('p', 's', 'https://github.com/o/r', 'd')
+    assert not hasattr(e, '__dict__')
+    assert e.as_dict()['repo'] == 'o/r'
@@ -0,0 +1,21 @@
+from ghfetch import GitHubClient
+from stub_github import StubGitHub
+from topic import find_candidates
+
+TOPICS = {
+    'quant': [(f'q/repo{i}', 5000 - i) for i in range(150)] + [('q/small', 10)],
+    'trading': [('q/repo0', 5000), ('t/bot', 1500), ('t/tiny', 999)],
+}
+
+
+def test_find_candidates_dedupes_and_filters():
+    with StubGitHub({}, topics=TOPICS) as srv:
+        client = GitHubClient(base_url=srv.url, workers=2)
+        df = find_candidates(client, ['quant', 'trading'], 1000, listed=['Q/Repo1'])
+    assert len(df) == 150
+    assert df.loc[0, 'repo'] == 'q/repo0'
+    assert df.loc[0, 'topics'] == 'quant trading'
+    assert 'q/repo1' not in set(df['repo'])
+    assert not {'q/small', 't/tiny'} & set(df['repo'])
+    # two pages for 'quant', one for 'trading'
+    assert len(srv.paths) == 3
@@ -1,25 +1,80 @@
-
+import argparse
 import os
-from github import Github
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from ghfetch import GitHubClient
+from readme import iter_entries
+
+TOPICS = ['quant', 'quantitative-finance', 'algorithmic-trading', 'backtesting',
+          'trading', 'portfolio-optimization']
+
+
+def search_topic(client, topic, min_stars, per_page=100):
+    """Repos tagged ``topic`` with at least ``min_stars``, most starred first.
+
+    The threshold is part of the search query, so GitHub only returns
+    pages that are kept.
+    """
+    repos = []
+    query = f'topic:{topic} stars:>={min_stars}'
+    for page in range(1, 1000 // per_page + 1):
+        res = client.get('/search/repositories', params=dict(
+            q=query, sort='stars', order='desc', per_page=per_page, page=page))
+        if not res.ok:
+            print(f'ERROR {topic} page {page}: {res.status_code}')
+            break
+        items = res.json()['items']
+        repos.extend(dict(
+            repo=r['full_name'],
+            stars=r['stargazers_count'],
+            language=r['language'],
+            url=r['html_url'],
+            description=r['description'],
+            updated_at=r['updated_at'],
+            archived=r['archived'],
+            topic=topic,
+        ) for r in items)
+        if len(items) < per_page:
+            break
+    return repos
+
+
+def find_candidates(client, topics, min_stars, listed=()):
+    """Search ``topics`` concurrently and return the repos not yet ``listed``,
+    one row per repo with all the matching topics joined.
+    """
+    with ThreadPoolExecutor(max_workers=client.workers) as pool:
+        results = pool.map(lambda t: search_topic(client, t, min_stars), topics)
+        df = pd.DataFrame([r for repos in results for r in repos],
+                          columns=['repo', 'stars', 'language', 'url', 'description',
+                                   'updated_at', 'archived', 'topic'])
+    topics = df.groupby('repo', sort=False)['topic'].agg(' '.join)
+    df = df.drop_duplicates('repo').drop(columns='topic')
+    df['topics'] = df['repo'].map(topics)
+    listed = {r.lower() for r in listed}
+    df = df[~df['repo'].str.lower().isin(listed)]
+    return df.sort_values('stars', ascending=False, ignore_index=True)
 
-# using an access token
-g = Github(os.environ['GITHUB_ACCESS_TOKEN'])
 
-# ts = g.search_topics('trading')
+def main():
+    parser = argparse.ArgumentParser(description='Find popular repos by GitHub topic')
+    parser.add_argument('topics', nargs='*', default=TOPICS)
+    parser.add_argument('--min-stars', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--readme', default='README.md')
+    parser.add_argument('--output', default='candidates.csv')
+    args = parser.parse_args()
 
-# for t in ts:
-#     print(t)
+    client = GitHubClient(os.environ.get('GITHUB_ACCESS_TOKEN'), workers=args.workers)
+    with open(args.readme, 'r', encoding='utf8') as f:
+        listed = [e.repo for e in iter_entries(f) if e.repo]
+    df = find_candidates(client, args.topics, args.min_stars, listed)
+    df.to_csv(args.output, index=False)
+    print(f'{len(df)} candidates not in {args.readme} written to {args.output} '
+          f'({client.requests} requests)')
 
-# t = ts[0]
-# print(t)
-# print(t.name)
-# print(t.updated_at)
-# print(t.score)
 
-topic = 'quant'
-repos = g.search_repositories(query=f'topic:{topic}')
-for repo in repos:
-    if repo.stargazers_count < 1000:
-        break
-    print(repo.name, repo.stargazers_count, repo.language, repo.html_url,
-          repo.description, repo.updated_at, repo.archived)
+if __name__ == '__main__':
+    main()